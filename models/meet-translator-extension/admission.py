@@ -0,0 +1,114 @@
+"""Admission control: bounded concurrency, bounded queues and deadlines"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Weight of the newest request in the service time moving average
+SERVICE_SMOOTHING = 0.1
+
+
+class AdmissionError(Exception):
+    """A request was turned away; `retry_after` is a hint in seconds"""
+
+    status = 503
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Overloaded(AdmissionError):
+    """The endpoint's queue is full"""
+
+    status = 429
+
+
+class DeadlineExceeded(AdmissionError):
+    """The request's deadline passed before its work could start"""
+
+    status = 503
+
+
+def check_deadline(deadline, retry_after=1):
+    """Raise DeadlineExceeded if `deadline` (time.monotonic) has passed"""
+    if deadline is not None and time.monotonic() >= deadline:
+        raise DeadlineExceeded("deadline exceeded", retry_after)
+
+
+class AdmissionGate:
+    """Per-endpoint limit on concurrent work with a bounded wait queue.
+
+    At most `concurrency` requests run at once and at most `queue_size`
+    wait for a slot; anything beyond that is rejected immediately with
+    Overloaded instead of piling up threads and buffered bodies. A queued
+    request whose deadline passes is dropped with DeadlineExceeded.
+    """
+
+    def __init__(self, name, concurrency, queue_size, budget):
+        self.name = name
+        self.concurrency = max(concurrency, 1)
+        self.queue_size = queue_size
+        self.budget = budget
+        self.cond = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+        self.service_time = 0.0
+        self.admitted = 0
+        self.rejected = 0
+        self.expired = 0
+
+    def deadline(self, budget_ms=None):
+        """Deadline for a request arriving now; `budget_ms` overrides the default"""
+        budget = budget_ms / 1000 if budget_ms else self.budget
+        return time.monotonic() + budget
+
+    def retry_after(self):
+        """Seconds until the queue has likely drained"""
+        backlog = (self.waiting + self.active) * self.service_time / self.concurrency
+        return max(math.ceil(backlog), 1)
+
+    @contextmanager
+    def admit(self, deadline=None):
+        with self.cond:
+            if self.active >= self.concurrency:
+                if self.waiting >= self.queue_size:
+                    self.rejected += 1
+                    raise Overloaded(f"{self.name} overloaded", self.retry_after())
+                self.waiting += 1
+                try:
+                    while self.active >= self.concurrency:
+                        remaining = None if deadline is None else deadline - time.monotonic()
+                        if remaining is not None and remaining <= 0:
+                            self.expired += 1
+                            raise DeadlineExceeded(f"{self.name} deadline exceeded in queue",
+                                                   self.retry_after())
+                        self.cond.wait(remaining)
+                finally:
+                    self.waiting -= 1
+            self.active += 1
+            self.admitted += 1
+
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - start
+            with self.cond:
+                self.active -= 1
+                self.service_time += SERVICE_SMOOTHING * (elapsed - self.service_time)
+                self.cond.notify()
+
+    def stats(self):
+        with self.cond:
+            return {
+                'active': self.active,
+                'waiting': self.waiting,
+                'concurrency': self.concurrency,
+                'queue_size': self.queue_size,
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'expired': self.expired,
+                'service_ms': round(self.service_time * 1000, 1),
+            }
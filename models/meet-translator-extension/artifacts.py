@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""Pre-traced and quantized sign model artifacts
+
+Keras rebuilds the model layer by layer and traces its call graph the
+first time it runs, on every start. An exported artifact is a SavedModel
+holding one traced serving function with a fixed input signature, so
+inference runs the restored graph without tracing. The recognizer still
+builds its Keras model before the artifact replaces it.
+
+    python artifacts.py export sign_model_artifact
+    SIGN_MODEL_ARTIFACT=sign_model_artifact python backend-server.py
+
+A TFLite conversion (float16 or int8 weights) runs on the TFLite
+interpreter instead of TensorFlow; int8 calibration uses recorded landmark
+windows, an .npz with `windows` (N, T, F) and optionally `labels` (N,).
+
+    python artifacts.py tflite sign_model.tflite --quantize int8 --dataset landmarks.npz
+    SIGN_TFLITE_MODEL=sign_model.tflite python backend-server.py
+"""
+
+import argparse
+import os
+import threading
+
+import numpy as np
+
+SIGN_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'sign_langauge'))
+# Windows fed to the int8 converter to calibrate activation ranges
+CALIBRATION_WINDOWS = 200
+QUANTIZE_MODES = ('none', 'float16', 'int8')
+
+
+def export_model(model, path):
+    """Save a Keras sequence model as a SavedModel with a traced `serve` function"""
+    import tensorflow as tf  # type: ignore
+
+    spec = tf.TensorSpec((None,) + tuple(model.input_shape[1:]), tf.float32, name='batch')
+
+    @tf.function(input_signature=[spec])
+    def serve(batch):
+        return model(batch, training=False)
+
+    module = tf.Module()
+    module.model = model
+    module.serve = serve
+    tf.saved_model.save(module, path, signatures={'serving_default': serve})
+
+
+class TracedModel:
+    """Stand-in for `recognizer.model` backed by an exported artifact.
+
+    Supports the two ways the recognizer calls its model: `model(batch,
+    training=False)` and `model.predict(batch)`.
+    """
+
+    def __init__(self, path):
+        import tensorflow as tf  # type: ignore
+        self.tf = tf
+        self.module = tf.saved_model.load(path)
+        _, inputs = self.module.signatures['serving_default'].structured_input_signature
+        self.input_shape = tuple(next(iter(inputs.values())).shape)
+
+    def __call__(self, batch, training=False):
+        return self.module.serve(self.tf.convert_to_tensor(batch, self.tf.float32))
+
+    def predict(self, batch, verbose=0):
+        return np.asarray(self(batch))
+
+
+def convert_tflite(model, path, quantize='float16', windows=None):
+    """Convert a Keras sequence model to a TFLite flatbuffer at `path`.
+
+    `quantize` is 'none', 'float16' (half-size weights) or 'int8' (weights
+    and activations, calibrated on `windows`); inputs and outputs stay
+    float32 either way so callers do not change. Returns the size in bytes.
+    """
+    import tensorflow as tf  # type: ignore
+
+    if quantize not in QUANTIZE_MODES:
+        raise ValueError(f"quantize must be one of {', '.join(QUANTIZE_MODES)}")
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantize != 'none':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantize == 'float16':
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantize == 'int8':
+        if windows is None:
+            raise ValueError("int8 quantization needs recorded landmark windows (--dataset)")
+        calibration = np.asarray(windows[:CALIBRATION_WINDOWS], np.float32)
+        converter.representative_dataset = lambda: ([window[np.newaxis]] for window in calibration)
+    flatbuffer = converter.convert()
+    with open(path, 'wb') as f:
+        f.write(flatbuffer)
+    return len(flatbuffer)
+
+
+def _tflite_interpreter():
+    """The standalone tflite_runtime interpreter if installed, else TensorFlow's"""
+    try:
+        from tflite_runtime.interpreter import Interpreter  # type: ignore
+    except ImportError:
+        import tensorflow as tf  # type: ignore
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+class TFLiteModel:
+    """Stand-in for `recognizer.model` running a TFLite conversion.
+
+    An interpreter has fixed tensor shapes, so batches are padded up to a
+    power of two and each size gets its own interpreter, created on first
+    use; a mix of batch sizes then never reallocates. `num_threads` is
+    handed to every interpreter (None lets TFLite decide).
+    """
+
+    def __init__(self, path, num_threads=None):
+        self.path = path
+        self.num_threads = num_threads
+        self.Interpreter = _tflite_interpreter()
+        self.interpreters = {}
+        self.lock = threading.Lock()
+        details = self._interpreter(1)[1]
+        self.input_shape = (None,) + tuple(int(d) for d in details['shape'][1:])
+
+    def _interpreter(self, size):
+        entry = self.interpreters.get(size)
+        if entry is None:
+            interpreter = self.Interpreter(model_path=self.path, num_threads=self.num_threads)
+            details = interpreter.get_input_details()[0]
+            interpreter.resize_tensor_input(details['index'], [size] + list(details['shape'][1:]))
+            interpreter.allocate_tensors()
+            entry = (interpreter, details, interpreter.get_output_details()[0])
+            self.interpreters[size] = entry
+        return entry
+
+    def __call__(self, batch, training=False):
+        batch = np.asarray(batch, np.float32)
+        count = len(batch)
+        size = 1 << max(count - 1, 0).bit_length()
+        if size != count:
+            batch = np.concatenate((batch, np.zeros((size - count,) + batch.shape[1:], np.float32)))
+        with self.lock:
+            interpreter, inputs, outputs = self._interpreter(size)
+            interpreter.set_tensor(inputs['index'], batch)
+            interpreter.invoke()
+            return interpreter.get_tensor(outputs['index'])[:count].copy()
+
+    def predict(self, batch, verbose=0):
+        return self(batch)
+
+
+def load_windows(path):
+    """(windows, labels) from a recorded landmark dataset; labels may be None"""
+    with np.load(path) as data:
+        windows = data['windows'].astype(np.float32)
+        labels = data['labels'] if 'labels' in data else None
+    return windows, labels
+
+
+def _load_keras(path, language):
+    if path:
+        import tensorflow as tf  # type: ignore
+        return tf.keras.models.load_model(path)
+    from workers import load_gesture_recognizer
+    return load_gesture_recognizer(SIGN_DIR, language).model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+    export = sub.add_parser('export', help='export the recognizer model as a traced SavedModel')
+    export.add_argument('path', help='output SavedModel directory')
+    tflite = sub.add_parser('tflite', help='convert the recognizer model to TFLite')
+    tflite.add_argument('path', help='output .tflite file')
+    tflite.add_argument('--quantize', choices=QUANTIZE_MODES, default='float16')
+    tflite.add_argument('--dataset', help='recorded landmark windows (.npz) for int8 calibration')
+    for command in (export, tflite):
+        command.add_argument('--language', default='isl')
+        command.add_argument('--keras-model', help='saved Keras model instead of the recognizer\'s')
+    args = parser.parse_args()
+
+    model = _load_keras(args.keras_model, args.language)
+    if args.command == 'export':
+        export_model(model, args.path)
+        print(f"Exported {args.path} (input {tuple(model.input_shape)})")
+    else:
+        windows = load_windows(args.dataset)[0] if args.dataset else None
+        size = convert_tflite(model, args.path, args.quantize, windows)
+        print(f"Converted {args.path} ({args.quantize}, {size / 1024:.0f} KiB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,303 @@
+"""Audio decoding helpers for the speech-to-text endpoint"""
+
+import base64
+import io
+import mmap
+import os
+import threading
+import struct
+import time
+import wave
+
+from metrics import stage
+from resample import PCMNormalizer, SAMPLE_FORMATS, WIDTH_FORMATS, MIN_RATE, MAX_RATE, MAX_CHANNELS, normalize_pcm
+
+# What every engine is fed: 16 kHz, 16-bit, mono PCM
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+
+# Compressed bodies decoded with PyAV, by container format
+COMPRESSED_MIMETYPES = {
+    'audio/ogg': 'ogg',
+    'audio/opus': 'ogg',
+    'audio/webm': 'webm',
+    'video/webm': 'webm',
+    'audio/flac': 'flac',
+    'audio/x-flac': 'flac',
+}
+# Raw PCM bodies; 16 kHz 16-bit mono unless declared otherwise
+RAW_PCM_MIMETYPES = ('audio/l16', 'audio/pcm', 'application/octet-stream')
+WAV_MIMETYPES = ('audio/wav', 'audio/x-wav', 'audio/wave')
+
+
+class AudioFormatError(ValueError):
+    """The request body could not be decoded to PCM"""
+
+
+def decode_compressed(fileobj, container_format):
+    """Decode Opus/Vorbis/FLAC audio packet by packet into 16 kHz mono PCM.
+
+    Each decoded frame is resampled and appended as it comes out of the
+    decoder, so memory grows with the PCM output only, never with a
+    float copy of the whole clip.
+    """
+    try:
+        import av  # type: ignore
+    except ImportError:
+        raise AudioFormatError("compressed audio needs PyAV (pip install av)")
+
+    pcm = bytearray()
+    try:
+        with av.open(fileobj, format=container_format) as container:
+            stream = container.streams.audio[0]
+            resampler = av.AudioResampler(format='s16', layout='mono', rate=SAMPLE_RATE)
+            for frame in container.decode(stream):
+                for out in resampler.resample(frame):
+                    pcm += out.to_ndarray().tobytes()
+            for out in resampler.resample(None):
+                pcm += out.to_ndarray().tobytes()
+    except (av.FFmpegError, IndexError) as e:
+        raise AudioFormatError(f"could not decode {container_format or 'the'} audio: {e}")
+    return bytes(pcm)
+
+
+def parse_wav(buf):
+    """(sample rate, sample format, channels, data view) of a PCM WAV buffer.
+
+    Walks the RIFF chunks directly so the samples come back as a slice of
+    `buf` rather than a copy read out through the wave module. The sample
+    format is one of resample.SAMPLE_FORMATS.
+    """
+    view = memoryview(buf)
+    if len(view) < 12 or view[:4] != b'RIFF' or view[8:12] != b'WAVE':
+        raise AudioFormatError("invalid WAV: not a RIFF/WAVE file")
+    fmt = None
+    pos = 12
+    while pos + 8 <= len(view):
+        chunk_id = bytes(view[pos:pos + 4])
+        size = struct.unpack_from('<I', view, pos + 4)[0]
+        body = view[pos + 8:pos + 8 + size]
+        if chunk_id == b'fmt ' and size >= 16:
+            fmt = struct.unpack_from('<HHIIHH', body)
+            # 0xFFFE is WAVE_FORMAT_EXTENSIBLE; the real tag opens its sub-format GUID
+            if fmt[0] == 0xFFFE and size >= 26:
+                fmt = struct.unpack_from('<H', body, 24) + fmt[1:]
+        elif chunk_id == b'data':
+            if fmt is None:
+                break
+            tag, channels, rate, _, _, bits = fmt
+            if tag == 3 and bits == 32:
+                sample_format = 'f32'
+            elif tag in (1, 0xFFFE) and bits // 8 in WIDTH_FORMATS:
+                sample_format = WIDTH_FORMATS[bits // 8]
+            else:
+                raise AudioFormatError("invalid WAV: only 8-32 bit integer or 32-bit float PCM is supported")
+            if not channels:
+                raise AudioFormatError("invalid WAV: no channels")
+            frame = SAMPLE_FORMATS[sample_format] * channels
+            return rate, sample_format, channels, body[:len(body) // frame * frame]
+        pos += 8 + size + (size & 1)
+    raise AudioFormatError("invalid WAV: missing fmt or data chunk")
+
+
+def normalize(pcm, rate, sample_format='s16', channels=1):
+    """`pcm` converted to 16 kHz 16-bit mono; returned as is when it already is"""
+    if (rate, sample_format, channels) == (SAMPLE_RATE, 's16', 1):
+        return pcm
+    try:
+        with stage('resample'):
+            return normalize_pcm(pcm, rate, sample_format, channels, SAMPLE_RATE)
+    except ValueError as e:
+        raise AudioFormatError(str(e))
+
+
+def decode_wav(buf):
+    """16 kHz 16-bit mono PCM of a PCM WAV body (a view into `buf` if no conversion is needed)"""
+    rate, sample_format, channels, pcm = parse_wav(buf)
+    return normalize(pcm, rate, sample_format, channels)
+
+
+def declared_format(params):
+    """(rate, sample format, channels) declared by `rate`, `format` and `channels` parameters.
+
+    Anything not given defaults to 16 kHz s16 mono.
+    """
+    try:
+        rate = int(params.get('rate', SAMPLE_RATE))
+        channels = int(params.get('channels', 1))
+    except ValueError:
+        raise AudioFormatError("rate and channels must be integers")
+    if not MIN_RATE <= rate <= MAX_RATE:
+        raise AudioFormatError(f"rate must be between {MIN_RATE} and {MAX_RATE}")
+    if not 1 <= channels <= MAX_CHANNELS:
+        raise AudioFormatError(f"channels must be between 1 and {MAX_CHANNELS}")
+    sample_format = params.get('format', 's16')
+    if sample_format not in SAMPLE_FORMATS:
+        raise AudioFormatError(f"format must be one of {', '.join(SAMPLE_FORMATS)}")
+    return rate, sample_format, channels
+
+
+def request_format(request):
+    """Format of a raw PCM body or stream: `?rate=&format=&channels=`, else content type parameters"""
+    return declared_format({**request.mimetype_params, **request.args})
+
+
+def stream_normalizer(request):
+    """PCMNormalizer for a PCM stream in the `request_format()`; None if it is already 16 kHz s16 mono"""
+    rate, sample_format, channels = request_format(request)
+    if (rate, sample_format, channels) == (SAMPLE_RATE, 's16', 1):
+        return None
+    try:
+        return PCMNormalizer(rate, sample_format, channels, SAMPLE_RATE)
+    except ValueError as e:
+        raise AudioFormatError(str(e))
+
+
+def read_body(request):
+    """Request body in a single buffer sized from Content-Length.
+
+    Reading straight into one preallocated bytearray avoids the list of
+    chunks and the final join of a plain read(), so the body is held in
+    memory exactly once. Returns a memoryview (bytes without a length).
+    """
+    length = request.content_length
+    if not length:
+        return request.get_data(cache=False)
+    buf = bytearray(length)
+    view = memoryview(buf)
+    filled = 0
+    while filled < length:
+        count = request.stream.readinto(view[filled:])
+        if not count:
+            break
+        filled += count
+    return view[:filled]
+
+
+def decode_file(path):
+    """16 kHz 16-bit mono PCM of an audio file in any format PyAV reads.
+
+    PCM WAV files are memory-mapped and converted block by block, so a
+    long recording is never read into memory at its original rate; other
+    files, including compressed WAV, go through PyAV with the container
+    detected from the file.
+    """
+    if path.lower().endswith('.wav') and os.path.getsize(path):
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            try:
+                rate, sample_format, channels, data = parse_wav(mapped)
+            except AudioFormatError:
+                data = None
+            if data is not None:
+                pcm = bytes(normalize(data, rate, sample_format, channels))
+                # The map cannot be closed while a view of it is alive
+                data.release()
+                return pcm
+    with open(path, 'rb') as f:
+        return decode_compressed(f, None)
+
+
+def write_wav(path, pcm):
+    """Store 16 kHz 16-bit mono PCM as a WAV file"""
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(SAMPLE_WIDTH)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(pcm)
+
+
+def read_request_audio(request):
+    """Decode the audio of a /speech-to-text request into 16 kHz 16-bit PCM.
+
+    Accepts Ogg/WebM Opus (MediaRecorder output) or FLAC bodies, raw PCM
+    or WAV bodies, and the original JSON `{"audio": "data:...;base64,..."}`
+    payload. WAV and raw PCM at other rates, widths or channel counts are
+    converted; raw bodies declare their format as in `request_format()`,
+    data URLs as `data:audio/l16;rate=48000;channels=2;base64,...`.
+    Returns (pcm, info) where info has the body format, its size on the
+    wire, the decode time and the `source` format of WAV/PCM input; pcm is
+    a bytes-like object (possibly a memoryview of the request body), None
+    when there is no audio.
+    """
+    start = time.perf_counter()
+    mimetype = request.mimetype
+    pcm = source = None
+    # Binary bodies are read once; raw PCM and WAV samples are then passed
+    # on as views of that buffer, without further copies
+    if mimetype in COMPRESSED_MIMETYPES:
+        with stage('body_parse'):
+            body = read_body(request)
+        fmt = COMPRESSED_MIMETYPES[mimetype]
+        if body:
+            with stage('audio_decode'):
+                pcm = decode_compressed(io.BytesIO(body), fmt)
+    elif mimetype in WAV_MIMETYPES:
+        fmt = 'wav'
+        with stage('body_parse'):
+            body = read_body(request)
+            wav = parse_wav(body) if body else None
+        if wav is not None:
+            rate, sample_format, channels, data = wav
+            source = {'rate': rate, 'format': sample_format, 'channels': channels}
+            pcm = normalize(data, rate, sample_format, channels)
+    elif mimetype in RAW_PCM_MIMETYPES:
+        rate, sample_format, channels = request_format(request)
+        with stage('body_parse'):
+            body = read_body(request)
+        fmt = 'pcm'
+        source = {'rate': rate, 'format': sample_format, 'channels': channels}
+        # A truncated upload's partial trailing frame cannot be a sample
+        frame = SAMPLE_FORMATS[sample_format] * channels
+        pcm = normalize(body[:len(body) // frame * frame], rate, sample_format, channels) or None
+    else:
+        # get_json caches the body, so the endpoint can read `engine` later
+        with stage('body_parse'):
+            data = request.get_json(silent=True) or {}
+            body = request.get_data()
+        fmt = 'json'
+        audio_data = data.get('audio')
+        if audio_data:
+            header, _, encoded = audio_data.rpartition(',')
+            params = dict(param.partition('=')[::2] for param in header.split(';')[1:])
+            rate, sample_format, channels = declared_format(params)
+            source = {'rate': rate, 'format': sample_format, 'channels': channels}
+            with stage('base64_decode'):
+                decoded = base64.b64decode(encoded)
+            pcm = normalize(decoded, rate, sample_format, channels) or None
+    info = {
+        'format': fmt,
+        'bytes_on_wire': len(body),
+        'decode_ms': round((time.perf_counter() - start) * 1000, 2),
+    }
+    if source is not None:
+        info['source'] = source
+    return pcm, info
+
+
+class IngressStats:
+    """Running totals of upload size and decode time per body format"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.formats = {}
+
+    def record(self, info, pcm):
+        with self.lock:
+            totals = self.formats.setdefault(info['format'], {
+                'requests': 0, 'bytes_on_wire': 0, 'audio_seconds': 0.0, 'decode_ms': 0.0})
+            totals['requests'] += 1
+            totals['bytes_on_wire'] += info['bytes_on_wire']
+            totals['audio_seconds'] += len(pcm or b'') / (SAMPLE_RATE * SAMPLE_WIDTH)
+            totals['decode_ms'] += info['decode_ms']
+
+    def stats(self):
+        with self.lock:
+            return {
+                fmt: {
+                    'requests': t['requests'],
+                    'kbit_per_audio_second': round(t['bytes_on_wire'] * 8 / 1000 / t['audio_seconds'], 1)
+                    if t['audio_seconds'] else None,
+                    'decode_ms_avg': round(t['decode_ms'] / t['requests'], 2),
+                }
+                for fmt, t in self.formats.items()
+            }
@@ -0,0 +1,848 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for the backend server hot paths"""
+
+import argparse
+import base64
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import wave
+from types import SimpleNamespace
+
+import numpy as np
+import cv2
+
+from frames import decode_data_url, decode_frame_bytes
+from batching import InferenceScheduler
+from workers import FramePool, available_cores
+from gating import FrameGate, GateState
+from admission import AdmissionGate, AdmissionError
+
+# Landmark feature size per frame (2 hands x 21 points x xyz)
+FEATURE_SIZE = 126
+SEQUENCE_LENGTH = 30
+
+
+def synthetic_jpeg(width, height, quality=80):
+    """Encode a noisy synthetic frame so JPEG size is realistic"""
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    frame = cv2.GaussianBlur(frame, (9, 9), 0)
+    ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise RuntimeError("JPEG encoding failed")
+    return encoded.tobytes()
+
+
+def measure(fn, iterations):
+    """Return (CPU ms per call, peak traced allocation in KiB per call)"""
+    fn()
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    cpu_ms = (time.process_time() - start) * 1000 / iterations
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu_ms, peak / 1024
+
+
+def bench_decode(args):
+    """Compare the JSON data-URL and raw-body frame ingestion paths"""
+    width, height = (int(v) for v in args.size.split('x'))
+    jpeg = synthetic_jpeg(width, height)
+    json_body = json.dumps({
+        'frame': 'data:image/jpeg;base64,' + base64.b64encode(jpeg).decode('ascii')
+    }).encode('utf-8')
+
+    def json_path():
+        return decode_data_url(json.loads(json_body)['frame'])
+
+    def raw_path():
+        return decode_frame_bytes(jpeg)
+
+    print(f"Frame: {width}x{height}, JPEG {len(jpeg) / 1024:.1f} KiB, "
+          f"JSON body {len(json_body) / 1024:.1f} KiB")
+    print(f"{'path':<8}{'cpu ms/frame':>14}{'peak KiB':>12}")
+    for name, fn in (('json', json_path), ('raw', raw_path)):
+        cpu_ms, peak_kib = measure(fn, args.iterations)
+        print(f"{name:<8}{cpu_ms:>14.3f}{peak_kib:>12.1f}")
+
+
+def _stream_client(url, jpeg, fps, duration, stats, lock):
+    """One simulated viewer pushing frames over the WebSocket stream"""
+    from simple_websocket import Client, ConnectionClosed
+
+    ws = Client.connect(url)
+    sent_at = {}
+    received = []
+    dropped = 0
+
+    def reader():
+        nonlocal dropped
+        try:
+            while True:
+                result = json.loads(ws.receive())
+                received.append(time.perf_counter() - sent_at[result['seq']])
+                dropped = result.get('dropped', dropped)
+        except (ConnectionClosed, KeyError):
+            pass
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    interval = 1.0 / fps
+    deadline = time.perf_counter() + duration
+    seq = 0
+    while time.perf_counter() < deadline:
+        sent_at[seq] = time.perf_counter()
+        ws.send(jpeg)
+        seq += 1
+        time.sleep(interval)
+    time.sleep(1.0)
+    ws.close()
+    thread.join(timeout=1)
+
+    with lock:
+        stats['sent'] += seq
+        stats['dropped'] += dropped
+        stats['latencies'].extend(received)
+
+
+def bench_stream(args):
+    """Load-test /sign-language/stream with concurrent simulated clients"""
+    width, height = (int(v) for v in args.size.split('x'))
+    jpeg = synthetic_jpeg(width, height)
+    stats = {'sent': 0, 'dropped': 0, 'latencies': []}
+    lock = threading.Lock()
+
+    threads = [
+        threading.Thread(target=_stream_client,
+                         args=(args.url, jpeg, args.fps, args.duration, stats, lock))
+        for _ in range(args.clients)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    latencies = np.array(stats['latencies']) * 1000
+    print(f"Clients: {args.clients}, {args.fps} fps each, {args.duration}s")
+    print(f"Frames sent: {stats['sent']}, results: {len(latencies)}, dropped: {stats['dropped']}")
+    if len(latencies):
+        print(f"Latency ms p50={np.percentile(latencies, 50):.1f} "
+              f"p95={np.percentile(latencies, 95):.1f} max={latencies.max():.1f}")
+
+
+def synthetic_model(num_classes=64, hidden=256):
+    """Dense stand-in for the sequence model: (N, T, F) -> (N, C) softmax"""
+    rng = np.random.default_rng(0)
+    w1 = rng.standard_normal((SEQUENCE_LENGTH * FEATURE_SIZE, hidden)).astype(np.float32) * 0.01
+    w2 = rng.standard_normal((hidden, num_classes)).astype(np.float32) * 0.1
+
+    def predict_batch(batch):
+        hidden_out = np.tanh(batch.reshape(len(batch), -1) @ w1)
+        logits = hidden_out @ w2
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    return predict_batch
+
+
+def keras_model(path):
+    """Load a saved Keras model and wrap it as a batch predictor"""
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(path)
+    return lambda batch: np.asarray(model(batch, training=False))
+
+
+def _run_clients(scheduler, clients, duration):
+    """Each simulated session submits windows back-to-back for `duration`"""
+    latencies = []
+    lock = threading.Lock()
+    window = np.random.default_rng(1).random((SEQUENCE_LENGTH, FEATURE_SIZE), dtype=np.float32)
+    deadline = time.perf_counter() + duration
+
+    def client():
+        local = []
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            scheduler.submit(window).result()
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return np.array(latencies) * 1000
+
+
+def bench_batch(args):
+    """Throughput vs latency of batched and per-frame model inference"""
+    predict_batch = keras_model(args.keras_model) if args.keras_model else synthetic_model()
+    print(f"{'clients':>8}{'mode':>10}{'windows/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'avg batch':>11}")
+    for clients in args.clients:
+        for mode, max_batch, max_latency in (('single', 1, 0.0),
+                                             ('batched', args.max_batch, args.max_latency_ms / 1000)):
+            scheduler = InferenceScheduler(predict_batch, max_batch, max_latency)
+            latencies = _run_clients(scheduler, clients, args.duration)
+            scheduler.stop()
+            avg_batch = scheduler.windows / max(scheduler.batches, 1)
+            print(f"{clients:>8}{mode:>10}{len(latencies) / args.duration:>12.0f}"
+                  f"{np.percentile(latencies, 50):>10.2f}{np.percentile(latencies, 95):>10.2f}"
+                  f"{avg_batch:>11.1f}")
+
+
+class SyntheticExtractor:
+    """CPU-bound stand-in for MediaPipe: skin mask moments on a downscaled frame"""
+
+    def extract_features(self, frame):
+        small = cv2.resize(frame, (256, 192), interpolation=cv2.INTER_AREA)
+        hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+        mask = cv2.inRange(hsv, (0, 40, 60), (25, 255, 255))
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, np.ones((5, 5), np.uint8))
+        hu = cv2.HuMoments(cv2.moments(mask)).ravel()
+        return np.resize(hu, FEATURE_SIZE).astype(np.float32)
+
+
+def _drive(extract, jpeg, clients, duration):
+    """Frames/s when `clients` threads call extract(jpeg) back-to-back"""
+    counts = [0] * clients
+    deadline = time.perf_counter() + duration
+
+    def client(i):
+        while time.perf_counter() < deadline:
+            extract(jpeg)
+            counts[i] += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sum(counts) / duration
+
+
+def bench_pool(args):
+    """In-thread decode+extract versus the worker process pool"""
+    width, height = (int(v) for v in args.size.split('x'))
+    jpeg = synthetic_jpeg(width, height)
+    extractor = SyntheticExtractor()
+    lock = threading.Lock()
+
+    def in_thread(buf):
+        # Mirrors the server: the shared extractor is serialized by a lock
+        frame = decode_frame_bytes(buf)
+        with lock:
+            return extractor.extract_features(frame)
+
+    workers = args.workers or max(available_cores() - 1, 1)
+    print(f"Frame: {width}x{height}, {available_cores()} cores, {workers} workers")
+    print(f"{'mode':<10}{'frames/s':>10}")
+    print(f"{'threads':<10}{_drive(in_thread, jpeg, args.clients, args.duration):>10.0f}")
+    pool = FramePool(SyntheticExtractor, num_workers=workers)
+    try:
+        print(f"{'pool':<10}{_drive(pool.extract, jpeg, args.clients, args.duration):>10.0f}")
+        print(f"Pool health: {pool.health()}")
+    finally:
+        pool.stop()
+
+
+def synthetic_scene(width, height, count, hand_from=None):
+    """Encoded frames of a static scene; a skin blob moves once `hand_from` is reached"""
+    rng = np.random.default_rng(0)
+    background = cv2.GaussianBlur(rng.integers(0, 255, (height, width, 3), dtype=np.uint8), (21, 21), 0)
+    skin = (120, 160, 220)
+    frames = []
+    for i in range(count):
+        frame = background.copy()
+        if hand_from is not None and i >= hand_from:
+            x = int(width * (0.2 + 0.6 * ((i - hand_from) % 20) / 20))
+            cv2.circle(frame, (x, height // 2), height // 8, skin, -1)
+        ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
+        frames.append(encoded.tobytes())
+    return frames
+
+
+def bench_gate(args):
+    """Cost of the motion / hand-presence gate against full recognition"""
+    width, height = (int(v) for v in args.size.split('x'))
+    extractor = SyntheticExtractor()
+    scenes = (
+        ('no hands', synthetic_scene(width, height, args.frames)),
+        ('static', synthetic_scene(width, height, args.frames, hand_from=0)[:1] * args.frames),
+        ('moving', synthetic_scene(width, height, args.frames, hand_from=0)),
+    )
+    print(f"{'scene':<10}{'skipped':>9}{'gate ms':>9}{'full ms':>9}{'saved ms':>10}")
+    for name, frames in scenes:
+        gate, state = FrameGate(), GateState()
+        for buf in frames:
+            reason = gate.check(state, buf)
+            if reason is None:
+                start = time.perf_counter()
+                extractor.extract_features(decode_frame_bytes(buf))
+                gate.processed(state, {'gesture': None}, time.perf_counter() - start)
+        stats = gate.stats()
+        skipped = stats['skipped_static'] + stats['skipped_no_hands']
+        print(f"{name:<10}{skipped / len(frames):>8.0%}{stats['gate_ms_avg']:>9.3f}"
+              f"{stats['full_ms_avg']:>9.3f}{stats['saved_ms_est']:>10.1f}")
+
+
+def bench_speech(args):
+    """Per-engine recognition latency over a fixed corpus of WAV files"""
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'speech to text'))
+    import speech_recognition as sr
+    from engines import ENGINES
+
+    corpus = []
+    for path in args.wavs:
+        with sr.AudioFile(path) as source:
+            audio = sr.Recognizer().record(source)
+        corpus.append((os.path.basename(path), audio, len(audio.frame_data) / audio.sample_rate / audio.sample_width))
+    total_audio = sum(seconds for _, _, seconds in corpus)
+    print(f"Corpus: {len(corpus)} files, {total_audio:.1f}s of audio")
+
+    print(f"{'engine':<8}{'load ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'RTF':>7}{'errors':>8}")
+    transcripts = {}
+    for name in args.engines:
+        start = time.perf_counter()
+        try:
+            engine = ENGINES[name]()
+        except Exception as e:
+            print(f"{name:<8} unavailable: {e}")
+            continue
+        load_ms = (time.perf_counter() - start) * 1000
+
+        latencies, errors, busy = [], 0, 0.0
+        for _ in range(args.repeat):
+            for file_name, audio, _ in corpus:
+                start = time.perf_counter()
+                try:
+                    transcripts[name, file_name] = engine.recognize(audio)
+                except (sr.UnknownValueError, sr.RequestError) as e:
+                    transcripts[name, file_name] = f"<{type(e).__name__}>"
+                    errors += 1
+                elapsed = time.perf_counter() - start
+                latencies.append(elapsed * 1000)
+                busy += elapsed
+        rtf = busy / (total_audio * args.repeat)
+        print(f"{name:<8}{load_ms:>9.0f}{np.percentile(latencies, 50):>9.0f}"
+              f"{np.percentile(latencies, 95):>9.0f}{rtf:>7.2f}{errors:>8}")
+
+    if args.show_text:
+        for (name, file_name), text in sorted(transcripts.items(), key=lambda item: item[0][::-1]):
+            print(f"{file_name} [{name}]: {text}")
+
+
+def bench_speech_stream(args):
+    """Time to first partial and to final over /speech-to-text/stream"""
+    from simple_websocket import Client, ConnectionClosed
+    from speech_stream import chunk_rms, ENERGY_THRESHOLD
+
+    with wave.open(args.wav, 'rb') as wav:
+        if (wav.getframerate(), wav.getsampwidth(), wav.getnchannels()) != (16000, 2, 1):
+            raise SystemExit("WAV must be 16 kHz 16-bit mono")
+        pcm = wav.readframes(wav.getnframes())
+    chunk_bytes = int(16000 * args.chunk_ms / 1000) * 2
+    chunks = [pcm[i:i + chunk_bytes] for i in range(0, len(pcm), chunk_bytes)]
+
+    ws = Client.connect(args.url)
+    events = []
+    first_voiced = None
+
+    def reader():
+        try:
+            while True:
+                events.append((time.perf_counter(), json.loads(ws.receive())))
+        except ConnectionClosed:
+            pass
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    for chunk in chunks:
+        if first_voiced is None and chunk_rms(chunk) > ENERGY_THRESHOLD:
+            first_voiced = time.perf_counter()
+        ws.send(chunk)
+        time.sleep(args.chunk_ms / 1000)
+    audio_end = time.perf_counter()
+    ws.send(json.dumps({'event': 'end'}))
+    time.sleep(args.wait)
+    ws.close()
+    thread.join(timeout=1)
+
+    partials = [at for at, event in events if event.get('type') == 'partial']
+    finals = [(at, event) for at, event in events if event.get('type') == 'final']
+    print(f"Audio: {len(pcm) / 32000:.1f}s in {args.chunk_ms} ms chunks, "
+          f"{len(partials)} partials, {len(finals)} finals")
+    if first_voiced is not None and partials:
+        print(f"First partial after speech onset: {(partials[0] - first_voiced) * 1000:.0f} ms")
+    if finals:
+        print(f"Last final after audio end: {(finals[-1][0] - audio_end) * 1000:.0f} ms")
+    for _, event in finals:
+        print(f"  [{event['utterance']}] {event['text']}")
+
+
+def bench_admission(args):
+    """Latency of admitted requests and refusal rate under a burst, with and without a bounded queue"""
+    service = args.service_ms / 1000
+    print(f"{'mode':<10}{'admitted':>10}{'refused':>9}{'p50 ms':>9}{'p95 ms':>9}{'refuse ms':>11}")
+    for mode, queue_size in (('unbounded', args.clients), ('bounded', args.queue)):
+        gate = AdmissionGate('bench', args.concurrency, queue_size, args.deadline_ms / 1000)
+        latencies, refusals = [], []
+        lock = threading.Lock()
+
+        def client():
+            start = time.perf_counter()
+            try:
+                with gate.admit(gate.deadline()):
+                    time.sleep(service)
+                elapsed, target = time.perf_counter() - start, latencies
+            except AdmissionError:
+                elapsed, target = time.perf_counter() - start, refusals
+            with lock:
+                target.append(elapsed * 1000)
+
+        threads = [threading.Thread(target=client) for _ in range(args.clients)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        print(f"{mode:<10}{len(latencies):>10}{len(refusals):>9}"
+              f"{np.percentile(latencies, 50):>9.0f}{np.percentile(latencies, 95):>9.0f}"
+              f"{np.mean(refusals) if refusals else 0:>11.2f}")
+
+
+def bench_startup(args):
+    """Import cost of each heavy dependency, each measured in a fresh interpreter"""
+    import subprocess
+    here = os.path.dirname(os.path.abspath(__file__))
+    snippet = ("import time, importlib; t = time.perf_counter(); importlib.import_module({!r}); "
+               "print((time.perf_counter() - t) * 1000)")
+    print(f"{'module':<22}{'ms':>9}")
+    for module in args.modules:
+        times = []
+        for _ in range(args.repeat):
+            out = subprocess.run([sys.executable, '-c', snippet.format(module)], cwd=here,
+                                 capture_output=True, text=True)
+            if out.returncode != 0:
+                break
+            times.append(float(out.stdout.strip().splitlines()[-1]))
+        print(f"{module:<22}{min(times):>9.0f}" if times else f"{module:<22}{'missing':>9}")
+
+
+def bench_quantized(args):
+    """Accuracy and latency of TFLite conversions against the full Keras model"""
+    from artifacts import TFLiteModel, load_windows
+    windows, labels = load_windows(args.dataset)
+    full = keras_model(args.keras_model)
+
+    def predict_all(predict_batch):
+        return np.concatenate([predict_batch(windows[i:i + args.batch])
+                               for i in range(0, len(windows), args.batch)])
+
+    reference = np.argmax(predict_all(full), axis=1)
+    candidates = [('keras', '-', full, None)]
+    for path in args.tflite:
+        for threads in args.threads:
+            candidates.append((os.path.basename(path), threads, TFLiteModel(path, threads),
+                               os.path.getsize(path)))
+
+    print(f"{len(windows)} windows of {windows.shape[1:]}")
+    print(f"{'model':<28}{'threads':>8}{'KiB':>8}{'accuracy':>10}{'agree':>8}{'p50 ms':>9}{'p95 ms':>9}")
+    for name, threads, predict_batch, size in candidates:
+        predicted = np.argmax(predict_all(predict_batch), axis=1)
+        accuracy = f"{np.mean(predicted == labels):.1%}" if labels is not None else '-'
+        latencies = []
+        for window in windows[:args.latency_windows]:
+            start = time.perf_counter()
+            predict_batch(window[np.newaxis])
+            latencies.append((time.perf_counter() - start) * 1000)
+        kib = f"{size / 1024:.0f}" if size else '-'
+        print(f"{name:<28}{threads:>8}{kib:>8}{accuracy:>10}{np.mean(predicted == reference):>8.1%}"
+              f"{np.percentile(latencies, 50):>9.2f}{np.percentile(latencies, 95):>9.2f}")
+
+
+def bench_landmarks(args):
+    """Wire size and server CPU per frame: JPEG frames versus client-extracted landmarks"""
+    from landmarks import parse_landmarks
+    width, height = (int(v) for v in args.size.split('x'))
+    jpeg = synthetic_jpeg(width, height)
+    extractor = SyntheticExtractor()
+    features = np.random.default_rng(2).random((1, FEATURE_SIZE))
+    rows = [('jpeg', len(jpeg), lambda: extractor.extract_features(decode_frame_bytes(jpeg)))]
+    for dtype in ('float32', 'float16'):
+        body = features.astype('<' + ('f4' if dtype == 'float32' else 'f2')).tobytes()
+        rows.append((f"landmarks/{dtype}", len(body), lambda body=body, dtype=dtype: parse_landmarks(body, dtype)))
+    print(f"Frame: {width}x{height}")
+    print(f"{'input':<20}{'bytes':>9}{'cpu ms':>10}{'peak KiB':>10}")
+    for name, size, fn in rows:
+        cpu_ms, peak_kib = measure(fn, args.iterations)
+        print(f"{name:<20}{size:>9}{cpu_ms:>10.3f}{peak_kib:>10.1f}")
+
+
+def bench_window(args):
+    """Per-frame cost of the list feature window versus the ring buffer"""
+    from batching import RecognizerStages
+    frames = np.random.default_rng(3).random((64, FEATURE_SIZE), dtype=np.float32)
+    print(f"{'length':>7}{'buffer':>8}{'us/frame':>10}{'peak KiB':>10}")
+    for length in args.lengths:
+        recognizer = SimpleNamespace(model=None, extract_features=None, labels=[], sequence_length=length)
+        stages = RecognizerStages(recognizer)
+        for name, buffer in (('list', []), ('ring', stages.new_window())):
+            for f in frames[:length]:
+                stages.push(buffer, f)
+            i = iter(range(10 ** 9))
+
+            def push():
+                return stages.push(buffer, frames[next(i) % len(frames)])
+
+            cpu_ms, peak_kib = measure(push, args.iterations)
+            print(f"{length:>7}{name:>8}{cpu_ms * 1000:>10.2f}{peak_kib:>10.1f}")
+
+
+class SyntheticSpeechRecognizer:
+    """CPU-bound stand-in for a speech engine: spectral features over the chunk"""
+
+    name = 'synthetic'
+
+    def recognize(self, audio, name=None):
+        samples = np.frombuffer(audio.frame_data, np.int16).astype(np.float32)
+        frames = samples[:len(samples) // 400 * 400].reshape(-1, 400)
+        for _ in range(200):
+            spectrum = np.abs(np.fft.rfft(frames * np.hanning(400), axis=1))
+        return f"{len(frames)} frames, peak bin {int(spectrum.mean(axis=0).argmax())}", self.name
+
+
+def synthetic_meeting(minutes, sample_rate=16000):
+    """Talk spurts of 2-8 s (noise-modulated tones) separated by 0.5-2 s of quiet"""
+    rng = np.random.default_rng(4)
+    parts, total = [], int(minutes * 60 * sample_rate)
+    while sum(len(p) for p in parts) < total:
+        n = int(rng.uniform(2, 8) * sample_rate)
+        t = np.arange(n) / sample_rate
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * rng.uniform(2, 5) * t)
+        voice = envelope * (np.sin(2 * np.pi * rng.uniform(120, 250) * t) + 0.3 * rng.standard_normal(n))
+        parts.append((voice * 4000).astype(np.int16))
+        parts.append((rng.standard_normal(int(rng.uniform(0.5, 2) * sample_rate)) * 30).astype(np.int16))
+    return np.concatenate(parts)[:total].tobytes()
+
+
+def bench_transcribe(args):
+    """Wall-clock speedup of chunked long-audio transcription versus worker count"""
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'speech to text'))
+    import speech_recognition as sr
+    from trimming import SpeechTrimmer
+    from transcription import TranscriptionPool
+
+    pcm = synthetic_meeting(args.minutes)
+    start = time.perf_counter()
+    chunks = [chunk for _, _, chunk in SpeechTrimmer().segments(pcm, args.chunk_ms)]
+    print(f"{args.minutes:.0f} min of audio -> {len(chunks)} chunks "
+          f"(split in {(time.perf_counter() - start) * 1000:.0f} ms), {available_cores()} cores")
+
+    recognizer = SyntheticSpeechRecognizer()
+    start = time.perf_counter()
+    for chunk in chunks:
+        recognizer.recognize(sr.AudioData(chunk, 16000, 2))
+    baseline = time.perf_counter() - start
+    audio_seconds = len(pcm) / 32000
+    print(f"{'workers':>8}{'wall s':>9}{'speedup':>9}{'x realtime':>12}")
+    print(f"{'thread':>8}{baseline:>9.1f}{1:>9.1f}{audio_seconds / baseline:>12.0f}")
+    for workers in args.workers:
+        pool = TranscriptionPool(SyntheticSpeechRecognizer, (), workers)
+        try:
+            pool.recognize([chunks[0]] * workers)
+            start = time.perf_counter()
+            pool.recognize(chunks)
+            wall = time.perf_counter() - start
+        finally:
+            pool.stop()
+        print(f"{workers:>8}{wall:>9.1f}{baseline / wall:>9.1f}{audio_seconds / wall:>12.0f}")
+
+
+def bench_jobs(args):
+    """Submit audio files to a running server's job queue and report throughput"""
+    import urllib.request
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'speech to text'))
+    from audio import COMPRESSED_MIMETYPES
+
+    def call(method, path, body=None, content_type='application/json'):
+        req = urllib.request.Request(args.url + path, data=body, method=method,
+                                     headers={'Content-Type': content_type})
+        with urllib.request.urlopen(req) as resp:
+            return json.loads(resp.read())
+
+    # Uploads are typed by extension; anything else would be taken for raw PCM
+    mimetypes = {'.wav': 'audio/wav', '.pcm': 'audio/l16', '.raw': 'audio/l16', '.opus': 'audio/ogg'}
+    for mimetype, fmt in COMPRESSED_MIMETYPES.items():
+        mimetypes.setdefault('.' + fmt, mimetype)
+    if not args.by_path:
+        unknown = [path for path in args.files if os.path.splitext(path)[1].lower() not in mimetypes]
+        if unknown:
+            raise SystemExit(f"cannot upload {', '.join(unknown)}: use one of {', '.join(sorted(mimetypes))}, "
+                             "or --by-path for other formats")
+
+    start = time.perf_counter()
+    pending = {}
+    for path in args.files:
+        if args.by_path:
+            job = call('POST', '/jobs', json.dumps({'path': path}).encode('utf-8'))
+        else:
+            with open(path, 'rb') as f:
+                job = call('POST', '/jobs', f.read(), mimetypes[os.path.splitext(path)[1].lower()])
+        pending[job['id']] = path
+    print(f"Submitted {len(pending)} jobs in {time.perf_counter() - start:.1f} s")
+
+    audio_seconds, failed = 0.0, 0
+    while pending:
+        for job_id in list(pending):
+            job = call('GET', f'/jobs/{job_id}?wait=1')
+            if job['status'] == 'done':
+                audio_seconds += job['audio_seconds']
+            elif job['status'] == 'failed':
+                failed += 1
+                print(f"  {pending[job_id]}: {job['error']}")
+            else:
+                continue
+            del pending[job_id]
+    wall = time.perf_counter() - start
+    print(f"{len(args.files) - failed} done, {failed} failed, {audio_seconds / 3600:.2f} audio hours "
+          f"in {wall:.0f} s = {audio_seconds / wall:.1f} audio hours per hour")
+    print(f"Server: {call('GET', '/jobs?limit=0')['stats']}")
+
+
+def bench_resample(args):
+    """Throughput of the PCM normalization stage in audio seconds per CPU second"""
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'speech to text'))
+    from resample import normalize_pcm, to_int16
+
+    try:
+        import av  # type: ignore
+    except ImportError:
+        av = None
+    mono = np.frombuffer(synthetic_meeting(args.seconds / 60), np.int16).astype(np.float32) / 32768
+    print(f"{'source':>18}{'MiB':>7}{'numpy x':>9}{'pyav x':>9}")
+    for rate, sample_format, channels in ((8000, 's16', 1), (22050, 's16', 1), (44100, 's16', 2),
+                                          (48000, 's16', 1), (48000, 'f32', 2), (48000, 's24', 2)):
+        # Any rate will do for a throughput source; the meeting is just stretched
+        samples = np.repeat(mono[:, np.newaxis], channels, axis=1).reshape(-1)
+        samples = np.resize(samples, args.seconds * rate * channels)
+        if sample_format == 'f32':
+            buf = samples.astype('<f4').tobytes()
+        elif sample_format == 's24':
+            buf = (samples * 2 ** 23).astype('<i4').view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+        else:
+            buf = to_int16(samples)
+        start = time.process_time()
+        normalize_pcm(buf, rate, sample_format, channels)
+        numpy_x = args.seconds / (time.process_time() - start)
+        pyav_x = None
+        if av is not None and sample_format != 's24':
+            layout = 'stereo' if channels == 2 else 'mono'
+            fmt = 'flt' if sample_format == 'f32' else 's16'
+            frame = av.AudioFrame.from_ndarray(np.frombuffer(buf, '<f4' if fmt == 'flt' else '<i2')
+                                               .reshape(1, -1), format=fmt, layout=layout)
+            frame.sample_rate = rate
+            resampler = av.AudioResampler(format='s16', layout='mono', rate=16000)
+            start = time.process_time()
+            resampler.resample(frame)
+            resampler.resample(None)
+            pyav_x = args.seconds / (time.process_time() - start)
+        name = f"{rate} {sample_format} x{channels}"
+        pyav = '-' if pyav_x is None else f"{pyav_x:.0f}"
+        print(f"{name:>18}{len(buf) / 2 ** 20:>7.1f}{numpy_x:>9.0f}{pyav:>9}")
+
+
+def bench_metrics(args):
+    """Cost of a timed stage and of rendering /metrics with many series"""
+    from metrics import Registry, serving, stage
+
+    with serving('/bench'):
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            with stage('noop'):
+                pass
+        per_stage = (time.perf_counter() - start) / args.iterations
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        with stage('noop'):
+            pass
+    outside = (time.perf_counter() - start) / args.iterations
+    print(f"stage() in a request: {per_stage * 1e6:.2f} us, outside one: {outside * 1e6:.2f} us")
+
+    scrape = Registry()
+    histogram = scrape.histogram('bench_stage_seconds', 'bench', ('endpoint', 'stage'))
+    for endpoint in range(args.endpoints):
+        for name in range(8):
+            histogram.observe(0.01, f'/endpoint-{endpoint}', f'stage-{name}')
+    start = time.perf_counter()
+    text = scrape.render()
+    print(f"render {args.endpoints * 8} histogram series: {(time.perf_counter() - start) * 1000:.1f} ms, "
+          f"{len(text) / 1024:.0f} KiB")
+
+
+def bench_pcm_memory(args):
+    """Peak memory per concurrent /speech-to-text request: JSON/base64 versus binary bodies"""
+    import importlib.util
+    os.environ.update(SPEECH_PRELOAD='', SPEECH_CACHE_SIZE='0', SPEECH_TRANSCRIBE_WORKERS='0', JOBS_WORKERS='0')
+    spec = importlib.util.spec_from_file_location(
+        'backend_server', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend-server.py'))
+    server = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(server)
+    server.init_speech_recognizer()
+    # Stand-in engine that reads the samples, so only the request path is measured
+    server.speech_recognizer.recognize = lambda audio, name=None: (str(len(audio.get_raw_data())), 'stub')
+
+    def handle(context):
+        with context:
+            server.speech_response(None)
+
+    print(f"{'clip s':>7}{'body':>8}{'body MiB':>10}{'peak MiB/req':>14}{'x PCM':>8}")
+    for seconds in args.seconds:
+        pcm = synthetic_meeting(seconds / 60)
+        encoded = 'data:audio/l16;base64,' + base64.b64encode(pcm).decode('ascii')
+        bodies = (('json', json.dumps({'audio': encoded}).encode('utf-8'), 'application/json'),
+                  ('binary', pcm, 'audio/l16'))
+        for name, body, content_type in bodies:
+            # Request contexts (and their copy of the body) are built before tracing starts
+            contexts = [server.app.test_request_context('/speech-to-text', method='POST', data=body,
+                                                        content_type=content_type)
+                        for _ in range(args.concurrency)]
+            threads = [threading.Thread(target=handle, args=(context,)) for context in contexts]
+            tracemalloc.start()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            per_request = peak / args.concurrency
+            print(f"{seconds:>7}{name:>8}{len(body) / 2 ** 20:>10.1f}{per_request / 2 ** 20:>14.1f}"
+                  f"{per_request / len(pcm):>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    decode = sub.add_parser('decode', help=bench_decode.__doc__)
+    decode.add_argument('--size', default='1280x720', help='frame WIDTHxHEIGHT')
+    decode.add_argument('--iterations', type=int, default=200)
+    decode.set_defaults(func=bench_decode)
+
+    stream = sub.add_parser('stream', help=bench_stream.__doc__)
+    stream.add_argument('--url', default='ws://localhost:5000/sign-language/stream')
+    stream.add_argument('--clients', type=int, default=4)
+    stream.add_argument('--fps', type=float, default=10.0)
+    stream.add_argument('--duration', type=float, default=10.0)
+    stream.add_argument('--size', default='640x480', help='frame WIDTHxHEIGHT')
+    stream.set_defaults(func=bench_stream)
+
+    batch = sub.add_parser('batch', help=bench_batch.__doc__)
+    batch.add_argument('--clients', type=int, nargs='+', default=[1, 8, 32, 128])
+    batch.add_argument('--duration', type=float, default=3.0)
+    batch.add_argument('--max-batch', type=int, default=32)
+    batch.add_argument('--max-latency-ms', type=float, default=5.0)
+    batch.add_argument('--keras-model', help='saved Keras model instead of the synthetic one')
+    batch.set_defaults(func=bench_batch)
+
+    pool = sub.add_parser('pool', help=bench_pool.__doc__)
+    pool.add_argument('--clients', type=int, default=16)
+    pool.add_argument('--workers', type=int, default=0, help='0 = one per spare core')
+    pool.add_argument('--duration', type=float, default=3.0)
+    pool.add_argument('--size', default='640x480', help='frame WIDTHxHEIGHT')
+    pool.set_defaults(func=bench_pool)
+
+    window = sub.add_parser('window', help=bench_window.__doc__)
+    window.add_argument('--lengths', type=int, nargs='+', default=[15, 30, 60, 120])
+    window.add_argument('--iterations', type=int, default=20000)
+    window.set_defaults(func=bench_window)
+
+    gate = sub.add_parser('gate', help=bench_gate.__doc__)
+    gate.add_argument('--frames', type=int, default=200)
+    gate.add_argument('--size', default='640x480', help='frame WIDTHxHEIGHT')
+    gate.set_defaults(func=bench_gate)
+
+    landmarks = sub.add_parser('landmarks', help=bench_landmarks.__doc__)
+    landmarks.add_argument('--size', default='640x480', help='frame WIDTHxHEIGHT')
+    landmarks.add_argument('--iterations', type=int, default=200)
+    landmarks.set_defaults(func=bench_landmarks)
+
+    speech = sub.add_parser('speech', help=bench_speech.__doc__)
+    speech.add_argument('wavs', nargs='+', help='16-bit PCM WAV files')
+    speech.add_argument('--engines', nargs='+', default=['sphinx', 'google'])
+    speech.add_argument('--repeat', type=int, default=3)
+    speech.add_argument('--show-text', action='store_true', help='print every transcript')
+    speech.set_defaults(func=bench_speech)
+
+    transcribe = sub.add_parser('transcribe', help=bench_transcribe.__doc__)
+    transcribe.add_argument('--minutes', type=float, default=30.0)
+    transcribe.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    transcribe.add_argument('--chunk-ms', type=int, default=15000)
+    transcribe.set_defaults(func=bench_transcribe)
+
+    resample = sub.add_parser('resample', help=bench_resample.__doc__)
+    resample.add_argument('--seconds', type=int, default=300)
+    resample.set_defaults(func=bench_resample)
+
+    metrics = sub.add_parser('metrics', help=bench_metrics.__doc__)
+    metrics.add_argument('--iterations', type=int, default=200000)
+    metrics.add_argument('--endpoints', type=int, default=12)
+    metrics.set_defaults(func=bench_metrics)
+
+    pcm_memory = sub.add_parser('pcm-memory', help=bench_pcm_memory.__doc__)
+    pcm_memory.add_argument('--seconds', type=int, nargs='+', default=[10, 60, 300])
+    pcm_memory.add_argument('--concurrency', type=int, default=4)
+    pcm_memory.set_defaults(func=bench_pcm_memory)
+
+    jobs = sub.add_parser('jobs', help=bench_jobs.__doc__)
+    jobs.add_argument('files', nargs='+', help='audio files to transcribe')
+    jobs.add_argument('--url', default='http://localhost:5000')
+    jobs.add_argument('--by-path', action='store_true', help='submit paths relative to JOBS_INPUT_DIR instead of uploading')
+    jobs.set_defaults(func=bench_jobs)
+
+    speech_stream = sub.add_parser('speech-stream', help=bench_speech_stream.__doc__)
+    speech_stream.add_argument('wav', help='16 kHz 16-bit mono WAV file')
+    speech_stream.add_argument('--url', default='ws://localhost:5000/speech-to-text/stream')
+    speech_stream.add_argument('--chunk-ms', type=int, default=100)
+    speech_stream.add_argument('--wait', type=float, default=2.0, help='seconds to wait for the last final')
+    speech_stream.set_defaults(func=bench_speech_stream)
+
+    admission = sub.add_parser('admission', help=bench_admission.__doc__)
+    admission.add_argument('--clients', type=int, default=64, help='requests in the burst')
+    admission.add_argument('--concurrency', type=int, default=4)
+    admission.add_argument('--queue', type=int, default=16)
+    admission.add_argument('--service-ms', type=float, default=50.0)
+    admission.add_argument('--deadline-ms', type=float, default=1000.0)
+    admission.set_defaults(func=bench_admission)
+
+    quantized = sub.add_parser('quantized', help=bench_quantized.__doc__)
+    quantized.add_argument('dataset', help='recorded landmark windows (.npz with windows, labels)')
+    quantized.add_argument('--keras-model', required=True, help='saved full-precision Keras model')
+    quantized.add_argument('--tflite', nargs='+', required=True, help='converted .tflite files')
+    quantized.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4])
+    quantized.add_argument('--batch', type=int, default=32)
+    quantized.add_argument('--latency-windows', type=int, default=200)
+    quantized.set_defaults(func=bench_quantized)
+
+    startup = sub.add_parser('startup', help=bench_startup.__doc__)
+    startup.add_argument('--modules', nargs='+', default=[
+        'numpy', 'cv2', 'flask', 'flask_sock', 'speech_recognition', 'pocketsphinx',
+        'tensorflow', 'mediapipe', 'backend-server'])
+    startup.add_argument('--repeat', type=int, default=3)
+    startup.set_defaults(func=bench_startup)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
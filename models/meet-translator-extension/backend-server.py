@@ -2,84 +2,609 @@
 """Flask backend server for Chrome extension integration"""
 
 import os
+import time
+STARTED = time.perf_counter()
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
 os.environ['CUDA_VISIBLE_DEVICES'] = '-1'
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS
+from flask_sock import Sock
+from werkzeug.exceptions import HTTPException, RequestEntityTooLarge
 import sys
-import base64
-import numpy as np
-import cv2
 import speech_recognition as sr
-import io
-import wave
+import json
+import threading
+import uuid
 
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'sign_langauge'))
+from frames import read_request_bytes, stream_message_bytes, decode_frame_bytes
+from streaming import serve_frame_stream
+from speech_stream import serve_speech_stream
+from sessions import SessionManager
+from batching import InferenceScheduler, RecognizerStages, MAX_BATCH, MAX_LATENCY
+from workers import FramePool, auto_workers, process_cores, load_gesture_recognizer
+from gating import FrameGate
+from pacing import CaptureAdvisor
+
+SIGN_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'sign_langauge'))
+sys.path.append(SIGN_DIR)
+SPEECH_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'speech to text'))
+sys.path.append(SPEECH_DIR)
+
+from engines import EngineRegistry, DEFAULT_ENGINE, FALLBACK_ENGINE
+from trimming import SpeechTrimmer
+from audio import (read_request_audio, decode_file, write_wav, stream_normalizer, AudioFormatError, IngressStats,
+                   SAMPLE_RATE, SAMPLE_WIDTH)
+from cache import TranscriptCache, fingerprint, CACHE_SIZE, CACHE_TTL
+from admission import AdmissionGate, AdmissionError, check_deadline
+from startup import StartupProfile
+from landmarks import parse_landmarks, LandmarkFormatError
+from transcription import TranscriptionPool, load_speech_registry, TRANSCRIBE_CHUNK_MS
+from jobs import JobQueue, spool_path
+from metrics import registry, stage, current_endpoint, CONTENT_TYPE
 
 app = Flask(__name__)
+# Bodies beyond this are refused with 413 before they are buffered
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_UPLOAD_MB', 16)) * 1024 * 1024
 CORS(app)
+sock = Sock(app)
 
 recognizer = None
+sessions = None
+gate = None
+advisor = CaptureAdvisor()
 speech_recognizer = None
+trimmer = None
+ingress = IngressStats()
+transcripts = None
+transcriber = None
+jobs = None
+# Set once this process has loaded and warmed up its models
+ready = threading.Event()
+profile = StartupProfile(STARTED)
 
-def init_recognizer():
+# Per-endpoint concurrency, queue length and default deadline; clients can
+# send a tighter budget in X-Deadline-Ms
+sign_admission = AdmissionGate('sign-language', int(os.environ.get('SIGN_CONCURRENCY', 4)),
+                               int(os.environ.get('SIGN_QUEUE', 16)),
+                               float(os.environ.get('SIGN_DEADLINE_MS', 1000)) / 1000)
+speech_admission = AdmissionGate('speech-to-text', int(os.environ.get('SPEECH_CONCURRENCY', 4)),
+                                 int(os.environ.get('SPEECH_QUEUE', 16)),
+                                 float(os.environ.get('SPEECH_DEADLINE_MS', 30000)) / 1000)
+# Long-audio transcriptions get their own slots so they cannot starve live clips
+transcribe_admission = AdmissionGate('speech-to-text/transcribe', int(os.environ.get('TRANSCRIBE_CONCURRENCY', 1)),
+                                     int(os.environ.get('TRANSCRIBE_QUEUE', 4)),
+                                     float(os.environ.get('TRANSCRIBE_DEADLINE_MS', 600000)) / 1000)
+
+admission_gates = (sign_admission, speech_admission, transcribe_admission)
+
+# /metrics: requests and latency per endpoint (stream messages count as
+# requests), stage timings from metrics.stage() and queue depths
+requests_total = registry.counter('backend_requests_total', 'Requests and stream messages handled',
+                                  ('endpoint', 'status'))
+errors_total = registry.counter('backend_errors_total', 'Requests answered with an error', ('endpoint', 'status'))
+request_seconds = registry.histogram('backend_request_seconds', 'Request latency from routing to response',
+                                     ('endpoint',))
+registry.gauge('backend_admission_waiting', 'Requests queued for an admission slot',
+               lambda: {(admission.name,): admission.waiting for admission in admission_gates},
+               ('gate',))
+registry.gauge('backend_admission_active', 'Requests holding an admission slot',
+               lambda: {(admission.name,): admission.active for admission in admission_gates},
+               ('gate',))
+registry.gauge('backend_inference_queue_depth', 'Feature windows waiting for a batched forward pass',
+               lambda: {(): len(sessions.scheduler.pending)})
+registry.gauge('backend_sign_sessions', 'Live sign language sessions', lambda: {(): len(sessions)})
+registry.gauge('backend_jobs', 'Transcription jobs by state',
+               lambda: {(state,): count for state, count in jobs.stats()['jobs'].items()}, ('state',))
+
+def load_recognizer():
+    """Import TensorFlow/MediaPipe and load the sign language model"""
     global recognizer
-    try:
-        print("Initializing sign language recognizer...")
+    print("Loading sign language model...")
+    # GestureRecognizer always builds its Keras model, artifact or not
+    with profile.phase('sign_recognizer'):
         from core.gesture_recognizer import GestureRecognizer
         recognizer = GestureRecognizer(language='isl')
+    # A TFLite conversion (python artifacts.py tflite) or a pre-traced
+    # artifact (python artifacts.py export) then replaces that model for
+    # inference; the load is extra start-up time, repaid by not tracing
+    # the Keras call graph on the first frame
+    tflite_model = os.environ.get('SIGN_TFLITE_MODEL')
+    artifact = os.environ.get('SIGN_MODEL_ARTIFACT')
+    if tflite_model:
+        threads = os.environ.get('SIGN_TFLITE_THREADS')
+        with profile.phase('sign_artifact_load'):
+            from artifacts import TFLiteModel
+            recognizer.model = TFLiteModel(tflite_model, int(threads) if threads else None)
+        print(f"Sign model running on TFLite: {tflite_model}")
+    elif artifact:
+        with profile.phase('sign_artifact_load'):
+            from artifacts import TracedModel
+            recognizer.model = TracedModel(artifact)
+
+def init_recognizer():
+    global recognizer, sessions, gate, advisor
+    try:
+        print("Initializing sign language recognizer...")
+        if recognizer is None:
+            load_recognizer()
+        stages = RecognizerStages.from_recognizer(recognizer)
+        if stages is None:
+            print("Recognizer has no extract_features/labels - batching and workers disabled")
+        sessions = SessionManager(recognizer, stages=stages,
+                                  scheduler=init_batching(stages), pool=init_workers(stages))
+        gate = FrameGate() if os.environ.get('SIGN_GATE', '1') != '0' else None
+        advisor = CaptureAdvisor(len(sessions.pool) if sessions.pool is not None else 1)
         print("Recognizer ready!")
         return True
     except Exception as e:
         print(f"Failed to initialize recognizer: {e}")
         return False
 
-def init_speech_recognizer():
+def init_batching(stages):
+    """Set up cross-session micro-batching if the recognizer can be split"""
+    max_batch = int(os.environ.get('SIGN_MAX_BATCH', MAX_BATCH))
+    if stages is None or max_batch <= 1:
+        return None
+    max_latency = float(os.environ.get('SIGN_MAX_LATENCY_MS', MAX_LATENCY * 1000)) / 1000
+    print(f"Batching inference: max_batch={max_batch}, max_latency={max_latency * 1000:.1f}ms")
+    return InferenceScheduler(stages.predict_batch, max_batch, max_latency)
+
+def init_workers(stages):
+    """Start the decode/landmark worker processes (SIGN_WORKERS=auto|N|0)"""
+    setting = os.environ.get('SIGN_WORKERS', 'auto')
+    num_workers = auto_workers() if setting == 'auto' else int(setting)
+    if stages is None or num_workers <= 0:
+        return None
+    print(f"Starting {num_workers} frame workers...")
+    try:
+        # A slot holds any frame the upload limit lets through; shared
+        # memory pages are only committed as frames are written to them
+        return FramePool(load_gesture_recognizer, (SIGN_DIR, 'isl'), num_workers,
+                         slot_size=app.config['MAX_CONTENT_LENGTH'])
+    except Exception as e:
+        print(f"Frame workers unavailable, extracting in-process: {e}")
+        return None
+
+def load_speech_engines():
+    """Create the speech engine registry and its preloaded engines"""
     global speech_recognizer
+    # SPEECH_ENGINE picks the default engine; engines in SPEECH_PRELOAD
+    # (the local one by default) are loaded now and kept warm
+    preload = [name for name in os.environ.get('SPEECH_PRELOAD', FALLBACK_ENGINE).split(',') if name]
+    with profile.phase('speech_engines'):
+        speech_recognizer = EngineRegistry(os.environ.get('SPEECH_ENGINE', DEFAULT_ENGINE), preload)
+
+def init_speech_recognizer():
+    global speech_recognizer, trimmer, transcripts, transcriber, jobs
     try:
         print("Initializing speech recognizer...")
-        speech_recognizer = sr.Recognizer()
-        print("Speech recognizer ready!")
+        if speech_recognizer is None:
+            load_speech_engines()
+        trimmer = SpeechTrimmer() if os.environ.get('SPEECH_VAD', '1') != '0' else None
+        # SPEECH_CACHE_PATH adds an on-disk tier that survives restarts
+        cache_size = int(os.environ.get('SPEECH_CACHE_SIZE', CACHE_SIZE))
+        if cache_size > 0:
+            transcripts = TranscriptCache(cache_size, float(os.environ.get('SPEECH_CACHE_TTL', CACHE_TTL)),
+                                          os.environ.get('SPEECH_CACHE_PATH'))
+        transcriber = init_transcriber()
+        jobs = init_jobs()
+        print(f"Speech recognizer ready! Engines: {', '.join(speech_recognizer.loaded())}")
         return True
     except Exception as e:
         print(f"Failed to initialize speech recognizer: {e}")
         return False
 
+def init_transcriber():
+    """Start the chunk recognition processes (SPEECH_TRANSCRIBE_WORKERS=N|0, default one per core).
+
+    Each web worker gets its share of the cores (see workers.process_cores).
+    """
+    num_workers = int(os.environ.get('SPEECH_TRANSCRIBE_WORKERS', process_cores()))
+    if num_workers <= 1:
+        return None
+    preload = [name for name in os.environ.get('SPEECH_PRELOAD', FALLBACK_ENGINE).split(',') if name]
+    print(f"Starting {num_workers} transcription workers...")
+    try:
+        return TranscriptionPool(load_speech_registry,
+                                 (SPEECH_DIR, os.environ.get('SPEECH_ENGINE', DEFAULT_ENGINE), preload),
+                                 num_workers)
+    except Exception as e:
+        print(f"Transcription workers unavailable, recognizing in-thread: {e}")
+        return None
+
+def jobs_dir():
+    return os.environ.get('JOBS_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jobs'))
+
+def uploads_dir():
+    return os.path.join(jobs_dir(), 'uploads')
+
+def init_jobs():
+    """Open the persistent transcription job queue (JOBS_WORKERS=N|0, default 1)"""
+    num_workers = int(os.environ.get('JOBS_WORKERS', 1))
+    if num_workers <= 0:
+        return None
+    os.makedirs(jobs_dir(), exist_ok=True)
+    queue = JobQueue(os.path.join(jobs_dir(), 'jobs.sqlite3'), run_job, num_workers)
+    print(f"Job queue ready: {queue.stats()['jobs']}")
+    return queue
+
+def preload_models():
+    """Load model weights and engines without starting any threads.
+
+    Under a pre-fork server this runs once in the master, so workers share
+    the imported libraries and weights copy-on-write. Set PRELOAD_MODELS=0
+    when the TensorFlow build does not survive fork; every worker then
+    loads its own copy in start_worker().
+    """
+    try:
+        load_recognizer()
+    except Exception as e:
+        print(f"Failed to preload sign language model: {e}")
+    try:
+        load_speech_engines()
+    except Exception as e:
+        print(f"Failed to preload speech engines: {e}")
+
+def warm_up():
+    """Run dummy inputs through the loaded models before accepting traffic"""
+    if sessions is None:
+        return
+    try:
+        with profile.phase('warm_up'):
+            sessions.warm_up()
+        print(f"Sign language model warmed up in {profile.phases['warm_up']:.0f} ms")
+    except Exception as e:
+        print(f"Warm-up failed: {e}")
+
+def start_worker():
+    """Build this process's sessions, batcher, worker pool and caches, then warm up.
+
+    Threads, child processes and SQLite connections do not survive fork, so
+    a pre-fork server calls this in each worker after forking (see
+    gunicorn.conf.py). Returns (sign_loaded, speech_loaded).
+    """
+    profile.set_status('loading')
+    with profile.phase('sign_runtime'):
+        sign_loaded = init_recognizer()
+    with profile.phase('speech_runtime'):
+        speech_loaded = init_speech_recognizer()
+    warm_up()
+    ready.set()
+    profile.set_status('ready')
+    print(f"Sign Language Model loaded: {sign_loaded}")
+    print(f"Speech Recognizer loaded: {speech_loaded}")
+    print(f"Ready {profile.ready_after / 1000:.1f} s after start: {profile.phases}")
+    return sign_loaded, speech_loaded
+
+def start_worker_background():
+    """start_worker() on a thread, so the server answers /health and /ready at once"""
+    thread = threading.Thread(target=start_worker, name='model-loader', daemon=True)
+    thread.start()
+    return thread
+
+def create_app(start=True):
+    """Application factory for WSGI servers.
+
+    Loads the models in the calling process (unless PRELOAD_MODELS=0) and,
+    with `start`, starts serving state right away. Pass start=False when a
+    pre-fork server will call start_worker() in each worker.
+    """
+    profile.mark('imports')
+    if os.environ.get('PRELOAD_MODELS', '1') != '0':
+        profile.set_status('loading')
+        preload_models()
+    if start:
+        start_worker()
+    return app
+
+@app.errorhandler(RequestEntityTooLarge)
+def body_too_large(e):
+    return jsonify({'error': f"Request body exceeds {app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)} MB"}), 413
+
+def request_endpoint():
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+def is_websocket():
+    return request.headers.get('Upgrade', '').lower() == 'websocket'
+
+@app.before_request
+def start_request_metrics():
+    g.metrics_start = time.perf_counter()
+    g.metrics_token = current_endpoint.set(request_endpoint())
+
+@app.after_request
+def record_request_metrics(response):
+    # Stream routes record each message instead of the whole connection
+    if 'metrics_start' in g and not is_websocket():
+        endpoint = request_endpoint()
+        requests_total.inc(endpoint, str(response.status_code))
+        if response.status_code >= 400:
+            errors_total.inc(endpoint, str(response.status_code))
+        request_seconds.observe(time.perf_counter() - g.metrics_start, endpoint)
+    return response
+
+@app.teardown_request
+def end_request_metrics(exc):
+    token = g.pop('metrics_token', None)
+    if token is not None:
+        current_endpoint.reset(token)
+
+def record_message(endpoint, result, start):
+    """Count one stream message as a request of `endpoint`"""
+    status = 'error' if result.get('error') else 'ok'
+    requests_total.inc(endpoint, status)
+    if status == 'error':
+        errors_total.inc(endpoint, status)
+    request_seconds.observe(time.perf_counter() - start, endpoint)
+
+def json_result(payload):
+    """jsonify a successful response, timed as the json_encode stage"""
+    with stage('json_encode'):
+        return jsonify(payload)
+
+def recognize_frame(session, buf, deadline=None):
+    """Run one encoded frame through a session's recognizer and build the response.
+
+    Static and hand-free frames are answered from the session's last
+    response when the gate is enabled. Every response carries the capture
+    settings the client should use next. Returns None when `buf` is not a
+    decodable image; raises DeadlineExceeded for frames that went stale.
+    """
+    reason = gate.check(session.gate, buf) if gate is not None else None
+    if reason is not None:
+        response = gate.cached(session.gate, reason)
+    else:
+        start = time.perf_counter()
+        with advisor.track():
+            response = full_recognition(session, buf, deadline)
+        if response is None:
+            return None
+        if gate is not None:
+            gate.processed(session.gate, response, time.perf_counter() - start)
+    
+    response['capture'] = advisor.hint()
+    return response
+
+def full_recognition(session, buf, deadline=None):
+    if sessions.pool is not None:
+        result = sessions.process_encoded(session, buf, deadline)
+    else:
+        frame = decode_frame_bytes(buf)
+        result = sessions.process_frame(session, frame, deadline) if frame is not None else None
+    if result is None:
+        return None
+    gesture, confidence, _ = result
+    
+    if gesture:
+        print(f"Detected [{session.session_id}]: {gesture} ({confidence:.2f})")
+    
+    # Both paths empty the window on a frame without hands, so it holds
+    # something exactly when this frame's features were found
+    feature_buffer = session.recognizer.feature_buffer
+    return {
+        'gesture': gesture if gesture else None,
+        'confidence': float(confidence) if confidence else 0.0,
+        'buffer_size': len(feature_buffer),
+        'hands_detected': len(feature_buffer) > 0
+    }
+
+def request_deadline(admission):
+    """Deadline from the client's X-Deadline-Ms budget or the endpoint default"""
+    try:
+        budget = float(request.headers.get('X-Deadline-Ms', 0))
+    except ValueError:
+        budget = 0
+    return admission.deadline(budget if budget > 0 else None)
+
+def rejection(error, **fields):
+    """Fast refusal for a request admission control turned away"""
+    response = jsonify(dict(fields, error=str(error), retry_after=error.retry_after))
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, error.status
+
+def request_session_id():
+    """Client session id from the X-Session-Id header or ?session= query"""
+    return request.headers.get('X-Session-Id') or request.args.get('session') or 'default'
+
 @app.route('/sign-language', methods=['POST'])
 def process_sign_language():
     global recognizer
     try:
-        if recognizer is None:
+        if sessions is None:
             return jsonify({'error': 'Model not loaded', 'gesture': None, 'confidence': 0.0, 'buffer_size': 0, 'hands_detected': False}), 503
         
-        data = request.json
-        image_data = data.get('frame')
-        
-        if not image_data:
+        # Admission is decided before the body is read, so refused requests
+        # never buffer their payload
+        deadline = request_deadline(sign_admission)
+        with sign_admission.admit(deadline):
+            # Raw image bodies (image/jpeg, image/webp, application/octet-stream)
+            # and multipart uploads are decoded straight from the request buffer;
+            # the JSON data-URL payload is still accepted for older clients.
+            buf = read_request_bytes(request)
+            
+            result = recognize_frame(sessions.get(request_session_id()), buf, deadline) if buf else None
+        if result is None:
             return jsonify({'error': 'No frame provided'}), 400
         
-        img_bytes = base64.b64decode(image_data.split(',')[1])
-        nparr = np.frombuffer(img_bytes, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
-        gesture, confidence, _ = recognizer.process_frame(frame)
-        
-        if gesture:
-            print(f"Detected: {gesture} ({confidence:.2f})")
+        return json_result(result)
+    except AdmissionError as e:
+        return rejection(e, gesture=None, confidence=0.0)
+    except HTTPException:
+        # 413 from MAX_CONTENT_LENGTH and the like keep their status
+        raise
+    except Exception as e:
+        print(f"Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+def recognize_landmarks(session, body, dtype, deadline=None):
+    """Recognize client-extracted landmarks; raises LandmarkFormatError on a bad body"""
+    with stage('landmark_parse'):
+        frames = parse_landmarks(body, dtype, sessions.stages.feature_size)
+    with advisor.track():
+        gesture, confidence, _ = sessions.process_landmarks(session, frames, deadline)
+    if gesture:
+        print(f"Detected [{session.session_id}]: {gesture} ({confidence:.2f})")
+    feature_buffer = session.recognizer.feature_buffer
+    return {
+        'gesture': gesture if gesture else None,
+        'confidence': float(confidence) if confidence else 0.0,
+        'buffer_size': len(feature_buffer),
+        'hands_detected': frames[-1] is not None,
+        'frames': len(frames),
+        'capture': advisor.hint()
+    }
+
+@app.route('/sign-language/landmarks', methods=['POST'])
+def process_sign_landmarks():
+    """Landmark-only ingestion: the client runs hand tracking and sends features"""
+    try:
+        if sessions is None or sessions.stages is None:
+            return jsonify({'error': 'Landmark input needs a recognizer with extract_features()',
+                            'gesture': None, 'confidence': 0.0}), 503
         
-        return jsonify({
-            'gesture': gesture if gesture else None,
-            'confidence': float(confidence) if confidence else 0.0,
-            'buffer_size': len(recognizer.feature_buffer),
-            'hands_detected': len(recognizer.feature_buffer) > 0
-        })
+        deadline = request_deadline(sign_admission)
+        with sign_admission.admit(deadline):
+            dtype = request.args.get('dtype') or request.headers.get('X-Landmark-Dtype', 'float32')
+            with stage('body_parse'):
+                body = request.get_data(cache=False)
+            result = recognize_landmarks(sessions.get(request_session_id()), body, dtype, deadline)
+        return json_result(result)
+    except LandmarkFormatError as e:
+        return jsonify({'error': str(e), 'gesture': None, 'confidence': 0.0}), 400
+    except AdmissionError as e:
+        return rejection(e, gesture=None, confidence=0.0)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+@sock.route('/sign-language/stream')
+def stream_sign_language(ws):
+    """Long-lived session: client pushes frames, server pushes results in order"""
+    session_id = request_session_id()
+    if session_id == 'default':
+        session_id = uuid.uuid4().hex
+    # ?input=landmarks: binary messages carry landmark arrays, not images
+    landmark_dtype = request.args.get('dtype', 'float32') if request.args.get('input') == 'landmarks' else None
+    
+    endpoint = request_endpoint()
+
+    def handle(payload):
+        start = time.perf_counter()
+        # Counted as an error if decoding or recognition raises
+        result = {'error': 'unhandled'}
+        try:
+            result = recognize_message(payload)
+            return result
+        finally:
+            record_message(endpoint, result, start)
+
+    def recognize_message(payload):
+        if sessions is None:
+            return {'error': 'Model not loaded', 'gesture': None, 'confidence': 0.0, 'buffer_size': 0, 'hands_detected': False}
+        if landmark_dtype is not None and sessions.stages is None:
+            return {'error': 'Landmark input needs a recognizer with extract_features()'}
+        buf = payload if landmark_dtype is not None else stream_message_bytes(payload)
+        try:
+            deadline = sign_admission.deadline()
+            with sign_admission.admit(deadline):
+                session = sessions.get(session_id)
+                if landmark_dtype is not None:
+                    result = recognize_landmarks(session, buf, landmark_dtype, deadline)
+                else:
+                    result = recognize_frame(session, buf, deadline) if buf else None
+        except AdmissionError as e:
+            return {'error': str(e), 'retry_after': e.retry_after}
+        except LandmarkFormatError as e:
+            return {'error': str(e)}
+        if result is None:
+            return {'error': 'No frame provided'}
+        return result
+    
+    try:
+        serve_frame_stream(ws, handle)
+    finally:
+        if sessions is not None:
+            sessions.remove(session_id)
+
+@app.route('/sign-language/capture', methods=['GET'])
+def sign_language_capture():
+    """Recommended frame interval, size and JPEG quality for clients"""
+    return jsonify(advisor.hint())
+
+def recognize_chunks(chunks, engine_name, deadline=None):
+    """Recognize PCM chunks in order and join their text.
+
+    Raises sr.UnknownValueError when no chunk contained recognizable speech,
+    with the engines that reported no speech as its `engines` attribute,
+    and DeadlineExceeded if the deadline passes between chunks.
+    """
+    results = recognize_each(chunks, engine_name, deadline)
+    texts = [text for text, _ in results if text is not None]
+    if not texts:
+        error = sr.UnknownValueError()
+        error.engines = {engine for _, engine in results}
+        raise error
+    return ' '.join(texts), next(engine for text, engine in results if text is not None)
+
+def recognize_each(chunks, engine_name, deadline=None):
+    """[(text, engine)] per chunk; text is None where `engine` recognized no speech.
+
+    Several chunks are spread over the transcription workers; a single one
+    is recognized in this thread with the warm engines.
+    """
+    with stage('recognition'):
+        if transcriber is not None and len(chunks) > 1:
+            return transcriber.recognize(chunks, engine_name, deadline)
+        results = []
+        for chunk in chunks:
+            check_deadline(deadline)
+            try:
+                results.append(speech_recognizer.recognize(sr.AudioData(chunk, SAMPLE_RATE, SAMPLE_WIDTH),
+                                                           engine_name))
+            except sr.UnknownValueError as e:
+                results.append((None, getattr(e, 'engine', None)))
+        return results
+
+def recognize_cached(chunks, engine_name, deadline=None):
+    """recognize_chunks behind the transcript cache; returns (text, engine, cached).
+
+    A cached "no speech" answer raises sr.UnknownValueError with `cached`
+    set on it.
+    """
+    if transcripts is None:
+        return recognize_chunks(chunks, engine_name, deadline) + (False,)
+    
+    requested = engine_name or speech_recognizer.default
+    key = fingerprint(chunks, requested)
+    hit = transcripts.get(key)
+    if hit is not None:
+        text, engine = hit
+        if text is None:
+            error = sr.UnknownValueError()
+            error.cached = True
+            raise error
+        return text, engine, True
+    
+    try:
+        text, engine = recognize_chunks(chunks, engine_name, deadline)
+    except sr.UnknownValueError as e:
+        # Only the requested engine's own "no speech" is worth remembering;
+        # a fallback's may just mean the requested one was unreachable
+        if getattr(e, 'engines', None) == {requested}:
+            transcripts.put(key, None, requested)
+        raise
+    # A fallback engine's answer is not cached under the requested engine
+    if engine == requested:
+        transcripts.put(key, text, engine)
+    return text, engine, False
+
 @app.route('/speech-to-text', methods=['POST'])
 def process_speech():
     global speech_recognizer
@@ -87,52 +612,293 @@ def process_speech():
         if speech_recognizer is None:
             return jsonify({'error': 'Speech recognizer not loaded', 'text': None}), 503
         
-        data = request.json
-        audio_data = data.get('audio')
-        
-        if not audio_data:
-            return jsonify({'error': 'No audio provided'}), 400
-        
-        # Decode base64 audio data
-        audio_bytes = base64.b64decode(audio_data.split(',')[1])
+        deadline = request_deadline(speech_admission)
+        with speech_admission.admit(deadline):
+            return speech_response(deadline)
+    except AdmissionError as e:
+        return rejection(e, text=None)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Speech processing error: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+def speech_response(deadline):
+    """Decode, trim and recognize the current /speech-to-text request"""
+    # Opus (Ogg/WebM) and FLAC bodies are decoded to 16 kHz PCM here;
+    # raw PCM/WAV bodies and the base64 JSON payload are still accepted
+    try:
+        audio_bytes, upload = read_request_audio(request)
+    except AudioFormatError as e:
+        return jsonify({'error': str(e), 'text': None}), 415
+    
+    if not audio_bytes:
+        return jsonify({'error': 'No audio provided'}), 400
+    
+    ingress.record(upload, audio_bytes)
+    print(f"Speech upload: {upload['format']}, {upload['bytes_on_wire']} bytes, "
+          f"decoded in {upload['decode_ms']} ms")
+    
+    # Engine from the JSON payload or the ?engine= query
+    data = request.get_json(silent=True) or {}
+    engine_name = data.get('engine') or request.args.get('engine')
+    
+    # Drop leading/trailing silence and split at pauses; a silent
+    # upload is answered without running recognition at all
+    with stage('vad'):
+        chunks = trimmer.split(audio_bytes) if trimmer is not None else [audio_bytes]
+    if not chunks:
+        return jsonify({
+            'text': None,
+            'confidence': 0.0,
+            'status': 'no_speech',
+            'upload': upload
+        })
+    
+    try:
+        # Engine from the request ("engine": "google" | "sphinx") or the server default
+        text, engine, cached = recognize_cached(chunks, engine_name, deadline)
+        print(f"Speech recognized [{engine}{', cached' if cached else ''}]: {text}")
         
-        # Create audio data object
-        audio_file = sr.AudioData(audio_bytes, 16000, 2)
+        return json_result({
+            'text': text,
+            'confidence': 0.9,
+            'engine': engine,
+            'cached': cached,
+            'status': 'success',
+            'upload': upload
+        })
+    except ValueError as e:
+        return jsonify({'error': str(e), 'text': None}), 400
+    except sr.UnknownValueError as e:
+        return jsonify({
+            'text': None,
+            'confidence': 0.0,
+            'cached': getattr(e, 'cached', False),
+            'status': 'no_speech',
+            'upload': upload
+        })
+    except sr.RequestError as e:
+        return jsonify({
+            'error': f'Speech recognition service error: {e}',
+            'text': None
+        }), 500
+
+@app.route('/speech-to-text/transcribe', methods=['POST'])
+def transcribe_speech():
+    """Long recordings: split at pauses, recognize chunks in parallel, return timed segments"""
+    try:
+        if speech_recognizer is None:
+            return jsonify({'error': 'Speech recognizer not loaded', 'text': None}), 503
         
-        try:
-            # Recognize speech using Google Speech Recognition
-            text = speech_recognizer.recognize_google(audio_file)
-            print(f"Speech recognized: {text}")
-            
-            return jsonify({
-                'text': text,
-                'confidence': 0.9,
-                'status': 'success'
-            })
-        except sr.UnknownValueError:
-            return jsonify({
-                'text': None,
-                'confidence': 0.0,
-                'status': 'no_speech'
-            })
-        except sr.RequestError as e:
-            return jsonify({
-                'error': f'Speech recognition service error: {e}',
-                'text': None
-            }), 500
-            
+        deadline = request_deadline(transcribe_admission)
+        with transcribe_admission.admit(deadline):
+            return transcription_response(deadline)
+    except AdmissionError as e:
+        return rejection(e, text=None)
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Speech processing error: {e}")
+        print(f"Transcription error: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+def transcription_response(deadline):
+    start = time.perf_counter()
+    try:
+        audio_bytes, upload = read_request_audio(request)
+    except AudioFormatError as e:
+        return jsonify({'error': str(e), 'text': None}), 415
+    if not audio_bytes:
+        return jsonify({'error': 'No audio provided'}), 400
+    ingress.record(upload, audio_bytes)
+    
+    data = request.get_json(silent=True) or {}
+    engine_name = data.get('engine') or request.args.get('engine')
+    try:
+        result = transcribe_pcm(audio_bytes, engine_name, request.args.get('chunk_ms'), deadline)
+    except ValueError as e:
+        return jsonify({'error': str(e), 'text': None}), 400
+    except sr.RequestError as e:
+        return jsonify({'error': f'Speech recognition service error: {e}', 'text': None}), 500
+    
+    result['wall_ms'] = round((time.perf_counter() - start) * 1000)
+    result['upload'] = upload
+    return json_result(result)
+
+def transcribe_pcm(pcm, engine_name=None, chunk_ms=None, deadline=None):
+    """Split PCM at pauses, recognize the chunks in parallel and time-stamp the text"""
+    chunk_ms = int(chunk_ms or os.environ.get('SPEECH_TRANSCRIBE_CHUNK_MS', TRANSCRIBE_CHUNK_MS))
+    with stage('vad'):
+        segments = (trimmer or SpeechTrimmer()).segments(pcm, chunk_ms)
+    results = recognize_each([chunk for _, _, chunk in segments], engine_name, deadline)
+    timed = [
+        {'start': round(begin, 2), 'end': round(end, 2), 'text': text, 'engine': engine}
+        for (begin, end, _), (text, engine) in zip(segments, results) if text is not None
+    ]
+    return {
+        'text': ' '.join(segment['text'] for segment in timed) or None,
+        'segments': timed,
+        'status': 'success' if timed else 'no_speech',
+        'audio_seconds': round(len(pcm) / 32000, 1)
+    }
+
+def run_job(job):
+    """JobQueue runner: decode the job's file and transcribe it.
+
+    A spooled upload is deleted once the job is done or has failed; files
+    under JOBS_INPUT_DIR belong to the submitter and are left alone.
+    """
+    try:
+        pcm = decode_file(job['source'])
+        result = transcribe_pcm(pcm, job['engine'])
+        return result, len(pcm) / 32000
+    finally:
+        if os.path.dirname(job['source']) == uploads_dir():
+            try:
+                os.remove(job['source'])
+            except OSError:
+                pass
+
+def job_source(data):
+    """Resolve a submitted path, which must lie inside JOBS_INPUT_DIR"""
+    input_dir = os.environ.get('JOBS_INPUT_DIR')
+    if not input_dir:
+        raise ValueError("submitting server-side paths needs JOBS_INPUT_DIR; upload the audio instead")
+    root = os.path.realpath(input_dir)
+    path = os.path.realpath(os.path.join(root, data['path']))
+    if os.path.commonpath((root, path)) != root or not os.path.isfile(path):
+        raise ValueError(f"no such file under JOBS_INPUT_DIR: {data['path']}")
+    return path
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """Queue a transcription: JSON {"path": ...} under JOBS_INPUT_DIR, or an audio body"""
+    if jobs is None:
+        return jsonify({'error': 'Job queue not running'}), 503
+    try:
+        data = request.get_json(silent=True) or {}
+        engine_name = data.get('engine') or request.args.get('engine')
+        if data.get('path'):
+            source = job_source(data)
+        else:
+            # Uploaded bodies are decoded now and spooled as WAV for the worker
+            audio_bytes, _ = read_request_audio(request)
+            if not audio_bytes:
+                return jsonify({'error': 'Provide "path" or an audio body'}), 400
+            source = spool_path(uploads_dir(), '.wav')
+            write_wav(source, audio_bytes)
+        job_id = jobs.submit(source, engine_name)
+        return jsonify({'id': job_id, 'status': 'queued'}), 202
+    except AudioFormatError as e:
+        return jsonify({'error': str(e)}), 415
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/jobs', methods=['GET'])
+def list_jobs():
+    if jobs is None:
+        return jsonify({'error': 'Job queue not running'}), 503
+    try:
+        limit = int(request.args.get('limit', 100))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    return jsonify({'jobs': jobs.list(limit), 'stats': jobs.stats()})
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Poll a job; ?wait=N blocks up to N seconds for its status to change"""
+    if jobs is None:
+        return jsonify({'error': 'Job queue not running'}), 503
+    try:
+        wait = min(float(request.args.get('wait', 0)), 60)
+    except ValueError:
+        return jsonify({'error': 'wait must be a number of seconds'}), 400
+    job = jobs.get(job_id)
+    if job is not None and wait > 0:
+        job = jobs.wait(job_id, job['status'], wait)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job)
+
+@sock.route('/jobs/<job_id>/stream')
+def stream_job(ws, job_id):
+    """Push the job as JSON on every status change until it is done or failed"""
+    if jobs is None:
+        ws.send(json.dumps({'error': 'Job queue not running'}))
+        return
+    job = jobs.get(job_id)
+    while job is not None:
+        ws.send(json.dumps(job))
+        if job['status'] in ('done', 'failed'):
+            return
+        job = jobs.wait(job_id, job['status'], 30)
+    ws.send(json.dumps({'error': 'Unknown job'}))
+
+@sock.route('/speech-to-text/stream')
+def stream_speech(ws):
+    """Client streams PCM chunks; interim and final transcripts come back"""
+    endpoint = request_endpoint()
+    start = time.perf_counter()
+
+    def reject(error):
+        ws.send(json.dumps({'type': 'error', 'error': error}))
+        record_message(endpoint, {'error': error}, start)
+
+    if speech_recognizer is None:
+        return reject('Speech recognizer not loaded')
+    # Only the local engine produces partial results; others give finals only
+    name = request.args.get('engine') or os.environ.get('SPEECH_STREAM_ENGINE', FALLBACK_ENGINE)
+    try:
+        engine = speech_recognizer.get(name)
+    except Exception as e:
+        return reject(f"Speech engine '{name}' unavailable: {e}")
+    # Clients capturing at 44.1/48 kHz or in stereo/float declare it with
+    # ?rate=&format=&channels= and are converted as chunks arrive
+    try:
+        normalizer = stream_normalizer(request)
+    except AudioFormatError as e:
+        return reject(str(e))
+    serve_speech_stream(ws, engine.stream(), engine.name, normalizer,
+                        lambda result, message_start: record_message(endpoint, result, message_start))
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape target: request/error counts, queue depths, stage latency histograms"""
+    return app.response_class(registry.render(), content_type=CONTENT_TYPE)
+
+@app.route('/ready', methods=['GET'])
+def readiness():
+    """Readiness probe: 503 until models are loaded and warmed up in this worker"""
+    status = 200 if ready.is_set() else 503
+    return jsonify({
+        'ready': ready.is_set(),
+        'status': profile.status,
+        'sign_language_loaded': sessions is not None,
+        'speech_recognizer_loaded': speech_recognizer is not None
+    }), status
+
 @app.route('/health', methods=['GET'])
 def health():
     return jsonify({
         'status': 'ok', 
+        'startup': profile.stats(),
         'sign_language_loaded': recognizer is not None and recognizer.model is not None,
-        'speech_recognizer_loaded': speech_recognizer is not None
+        'speech_recognizer_loaded': speech_recognizer is not None,
+        'speech_engines': speech_recognizer.loaded() if speech_recognizer is not None else [],
+        'speech_vad': trimmer.stats() if trimmer is not None else None,
+        'speech_ingress': ingress.stats(),
+        'speech_cache': transcripts.stats() if transcripts is not None else None,
+        'transcription': transcriber.stats() if transcriber is not None else None,
+        'jobs': jobs.stats() if jobs is not None else None,
+        'admission': {'sign_language': sign_admission.stats(), 'speech_to_text': speech_admission.stats(),
+                      'transcribe': transcribe_admission.stats()},
+        'active_sessions': len(sessions) if sessions is not None else 0,
+        'workers': sessions.pool.health() if sessions is not None and sessions.pool is not None else None,
+        'gate': gate.stats() if gate is not None else None
     })
 
 if __name__ == '__main__':
@@ -140,17 +906,14 @@ if __name__ == '__main__':
     print("Sign Language Backend Server")
     print("="*50)
     print("Server: http://localhost:5000")
-    
-    sign_loaded = init_recognizer()
-    speech_loaded = init_speech_recognizer()
-    
-    print(f"Sign Language Model loaded: {sign_loaded}")
-    print(f"Speech Recognizer loaded: {speech_loaded}")
-    
-    if not sign_loaded:
-        print("Sign language recognition disabled")
-    if not speech_loaded:
-        print("Speech recognition disabled")
-    
+    print(f"Imports done in {profile.mark('imports'):.0f} ms")
     print("="*50 + "\n")
+    
+    # Models load in the background; endpoints answer 503 and /health
+    # reports startup.status = "loading" until they are ready.
+    # LOAD_IN_BACKGROUND=0 loads them before the server starts listening.
+    if os.environ.get('LOAD_IN_BACKGROUND', '1') != '0':
+        start_worker_background()
+    else:
+        start_worker()
     app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
@@ -0,0 +1,156 @@
+"""Micro-batched sequence-model inference shared by all sign language sessions"""
+
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from admission import DeadlineExceeded
+from feature_window import FeatureWindow
+
+# Largest batch handed to the model in one forward pass
+MAX_BATCH = 32
+# How long the first queued window may wait for others to join its batch
+MAX_LATENCY = 0.005
+# GestureRecognizer defaults when it does not expose them as attributes
+SEQUENCE_LENGTH = 30
+THRESHOLD = 0.5
+# Per-frame feature size when the model does not declare its input shape
+FEATURE_SIZE = 126
+
+
+class InferenceScheduler:
+    """Collect windows from many sessions and run them as one batch.
+
+    `predict_batch` takes a (N, T, F) float32 array and returns (N, C)
+    class probabilities. Each `submit()` returns a Future resolved with the
+    probability row for that window; windows whose deadline passed while
+    queued are failed with DeadlineExceeded instead of being run.
+    """
+
+    def __init__(self, predict_batch, max_batch=MAX_BATCH, max_latency=MAX_LATENCY):
+        self.predict_batch = predict_batch
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self.pending = []
+        self.cond = threading.Condition()
+        self.running = True
+        self.batches = 0
+        self.windows = 0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, window, deadline=None):
+        future = Future()
+        with self.cond:
+            self.pending.append((window, future, deadline))
+            self.cond.notify()
+        return future
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        self.thread.join(timeout=1)
+
+    def _next_batch(self):
+        with self.cond:
+            while not self.pending and self.running:
+                self.cond.wait()
+            deadline = time.monotonic() + self.max_latency
+            while len(self.pending) < self.max_batch and self.running:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.cond.wait(remaining)
+            batch = self.pending[:self.max_batch]
+            del self.pending[:self.max_batch]
+            return batch
+
+    def _run(self):
+        while self.running:
+            batch = self._next_batch()
+            now = time.monotonic()
+            live = []
+            for window, future, deadline in batch:
+                if deadline is not None and now >= deadline:
+                    future.set_exception(DeadlineExceeded("deadline exceeded before inference", 1))
+                else:
+                    live.append((window, future))
+            if not live:
+                continue
+            batch = live
+            windows, futures = zip(*batch)
+            try:
+                probs = self.predict_batch(np.stack(windows).astype(np.float32, copy=False))
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.windows += len(batch)
+            for future, row in zip(futures, probs):
+                future.set_result(row)
+
+
+class RecognizerStages:
+    """GestureRecognizer split into landmark extraction and sequence inference.
+
+    Batching needs the recognizer to expose `extract_features(frame)`
+    (feature vector, or None when no hands are visible) and its class
+    names as `labels` or `actions`. `sequence_length` and `threshold` are
+    read when present.
+    """
+
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self.extract_features = recognizer.extract_features
+        labels = getattr(recognizer, 'labels', None)
+        self.labels = list(labels if labels is not None else recognizer.actions)
+        self.sequence_length = getattr(recognizer, 'sequence_length', SEQUENCE_LENGTH)
+        shape = getattr(getattr(recognizer, 'model', None), 'input_shape', None)
+        self.feature_size = int(shape[-1]) if shape else FEATURE_SIZE
+        self.threshold = getattr(recognizer, 'threshold', THRESHOLD)
+
+    @classmethod
+    def from_recognizer(cls, recognizer):
+        """Return stages for `recognizer`, or None if it cannot be split"""
+        try:
+            return cls(recognizer)
+        except AttributeError:
+            return None
+
+    def predict_batch(self, batch):
+        return np.asarray(self.recognizer.model(batch, training=False))
+
+    def warm_up(self):
+        """One forward pass on a zero window, sized from the model's input"""
+        shape = getattr(self.recognizer.model, 'input_shape', None)
+        if shape is None:
+            return
+        self.predict_batch(np.zeros((1,) + tuple(shape[1:]), np.float32))
+
+    def new_window(self):
+        """Preallocated ring buffer sized for this model's feature windows"""
+        return FeatureWindow(self.sequence_length, self.feature_size)
+
+    def push(self, feature_buffer, features):
+        """Append a frame's features; return the full window once it is ready"""
+        if isinstance(feature_buffer, FeatureWindow):
+            feature_buffer.append(features)
+            return feature_buffer.window()
+        feature_buffer.append(features)
+        while len(feature_buffer) > self.sequence_length:
+            del feature_buffer[0]
+        if len(feature_buffer) < self.sequence_length:
+            return None
+        return np.asarray(feature_buffer, dtype=np.float32)
+
+    def decode(self, probs):
+        """Map a probability row to (gesture, confidence)"""
+        best = int(np.argmax(probs))
+        confidence = float(probs[best])
+        if confidence < self.threshold:
+            return None, confidence
+        return self.labels[best], confidence
@@ -0,0 +1,106 @@
+"""Transcript cache keyed by a fingerprint of the recognized audio"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Entries kept in memory; the least recently used one is evicted first
+CACHE_SIZE = 1024
+# Seconds a transcript stays valid
+CACHE_TTL = 3600.0
+
+
+def fingerprint(chunks, engine):
+    """Content hash of the PCM chunks that will be recognized and the engine.
+
+    Hashing the silence-trimmed chunks rather than the upload means a
+    retry with a different amount of leading or trailing silence, or a
+    different container format, still maps to the same entry.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(engine.encode('utf-8'))
+    for chunk in chunks:
+        digest.update(len(chunk).to_bytes(8, 'little'))
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TranscriptCache:
+    """Bounded LRU + TTL cache of (text, engine) with an optional disk tier.
+
+    A text of None records that the audio held no recognizable speech.
+    With `path`, entries are also written to a SQLite file and memory
+    misses fall through to it, so the cache survives restarts.
+    """
+
+    def __init__(self, max_entries=CACHE_SIZE, ttl=CACHE_TTL, path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.db = None
+        if path:
+            self.db = sqlite3.connect(path, check_same_thread=False)
+            self.db.execute('CREATE TABLE IF NOT EXISTS transcripts '
+                            '(key TEXT PRIMARY KEY, text TEXT, engine TEXT, created REAL)')
+            self.db.execute('DELETE FROM transcripts WHERE created < ?', (time.time() - ttl,))
+            self.db.commit()
+
+    def get(self, key):
+        """Return (text, engine) or None on a miss"""
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                text, engine, created = entry
+                if now - created < self.ttl:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return text, engine
+                del self.entries[key]
+                self.expirations += 1
+
+            if self.db is not None:
+                row = self.db.execute('SELECT text, engine, created FROM transcripts WHERE key = ?',
+                                      (key,)).fetchone()
+                if row is not None and now - row[2] < self.ttl:
+                    self._remember(key, row)
+                    self.disk_hits += 1
+                    return row[0], row[1]
+
+            self.misses += 1
+            return None
+
+    def put(self, key, text, engine):
+        entry = (text, engine, time.time())
+        with self.lock:
+            self._remember(key, entry)
+            if self.db is not None:
+                self.db.execute('INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?)', (key,) + entry)
+                self.db.commit()
+
+    def _remember(self, key, entry):
+        self.entries[key] = tuple(entry)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'disk': self.db is not None,
+            }
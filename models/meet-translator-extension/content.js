@@ -10,6 +10,11 @@ class MeetTranslator {
     this.videoStream = null;
     this.audioContext = null;
     this.recognition = null;
+    // Keeps this tab's temporal gesture window separate on the backend
+    this.sessionId = crypto.randomUUID();
+    // Frame interval, size and JPEG quality; the backend adjusts these
+    // with every response according to its load
+    this.capture = { interval_ms: 300, max_side: 672, quality: 0.7 };
   }
 
   init() {
@@ -132,8 +137,9 @@ class MeetTranslator {
     try {
       const canvas = document.createElement('canvas');
       const ctx = canvas.getContext('2d');
+      this.openSignLanguageStream();
       
-      this.signLanguageInterval = setInterval(() => {
+      const captureFrame = () => {
         if (!this.signLanguageActive) return;
         
         const videoElements = document.querySelectorAll('video');
@@ -145,14 +151,18 @@ class MeetTranslator {
             liveOutput.textContent = '⚠️ No video detected';
             liveOutput.style.display = 'block';
           }
-          return;
+        } else {
+          // Downscale to the size the backend asked for before encoding
+          const scale = Math.min(1, this.capture.max_side / Math.max(video.videoWidth, video.videoHeight));
+          canvas.width = Math.round(video.videoWidth * scale);
+          canvas.height = Math.round(video.videoHeight * scale);
+          ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
+          this.processSignLanguageFrame(canvas);
         }
-
-        canvas.width = video.videoWidth;
-        canvas.height = video.videoHeight;
-        ctx.drawImage(video, 0, 0);
-        this.processSignLanguageFrame(canvas);
-      }, 300);
+        
+        this.signLanguageTimer = setTimeout(captureFrame, this.capture.interval_ms);
+      };
+      captureFrame();
 
     } catch (error) {
       console.error('Sign language error:', error);
@@ -164,36 +174,45 @@ class MeetTranslator {
     }
   }
 
+  openSignLanguageStream() {
+    // One long-lived session: frames go up, results come back in order.
+    // Falls back to per-frame HTTP POSTs if the socket is unavailable.
+    try {
+      const socket = new WebSocket(`ws://localhost:5000/sign-language/stream?session=${this.sessionId}`);
+      socket.onmessage = (event) => this.showSignLanguageResult(JSON.parse(event.data));
+      socket.onclose = () => {
+        if (this.signLanguageSocket === socket) this.signLanguageSocket = null;
+      };
+      this.signLanguageSocket = socket;
+    } catch (error) {
+      console.log('Sign language stream unavailable:', error);
+    }
+  }
+
   async processSignLanguageFrame(canvas) {
     try {
-      const frameData = canvas.toDataURL('image/jpeg', 0.8);
+      // Send the encoded JPEG as a raw body instead of a base64 data URL in JSON
+      const frameBlob = await new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', this.capture.quality));
+      if (!frameBlob) return;
+
+      const socket = this.signLanguageSocket;
+      if (socket && socket.readyState === WebSocket.OPEN) {
+        // Skip this frame if the previous ones have not left the browser yet
+        if (socket.bufferedAmount < frameBlob.size) socket.send(frameBlob);
+        return;
+      }
       
       const response = await fetch('http://localhost:5000/sign-language', {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ frame: frameData })
+        headers: { 'Content-Type': 'image/jpeg', 'X-Session-Id': this.sessionId },
+        body: frameBlob
       });
       
       if (!response.ok) {
         throw new Error(`Backend error: ${response.status}`);
       }
       
-      const result = await response.json();
-      const liveOutput = document.getElementById('sign-live');
-      
-      console.log('Backend response:', result);
-      
-      if (result.gesture && result.confidence > 0.5) {
-        liveOutput.textContent = `👋 ${result.gesture} (${(result.confidence * 100).toFixed(0)}%)`;
-        liveOutput.style.display = 'block';
-        this.addToTranscript('Sign', result.gesture);
-      } else if (result.hands_detected) {
-        liveOutput.textContent = `👋 Hand detected - Building sequence (${result.buffer_size}/30)`;
-        liveOutput.style.display = 'block';
-      } else {
-        liveOutput.textContent = '👋 Show hand to camera';
-        liveOutput.style.display = 'block';
-      }
+      this.showSignLanguageResult(await response.json());
     } catch (error) {
       console.error('Sign language processing error:', error);
       const liveOutput = document.getElementById('sign-live');
@@ -202,9 +221,35 @@ class MeetTranslator {
     }
   }
 
+  showSignLanguageResult(result) {
+    const liveOutput = document.getElementById('sign-live');
+    if (result.capture) this.capture = result.capture;
+    if (!liveOutput) return;
+    
+    console.log('Backend response:', result);
+    
+    if (result.gesture && result.confidence > 0.5) {
+      liveOutput.textContent = `👋 ${result.gesture} (${(result.confidence * 100).toFixed(0)}%)`;
+      liveOutput.style.display = 'block';
+      // Frames the server skipped repeat earlier state; they are not new detections
+      if (!result.skipped) this.addToTranscript('Sign', result.gesture);
+    } else if (result.hands_detected) {
+      liveOutput.textContent = `👋 Hand detected - Building sequence (${result.buffer_size}/30)`;
+      liveOutput.style.display = 'block';
+    } else {
+      liveOutput.textContent = '👋 Show hand to camera';
+      liveOutput.style.display = 'block';
+    }
+  }
+
   stopSignLanguageRecognition() {
-    if (this.signLanguageInterval) {
-      clearInterval(this.signLanguageInterval);
+    if (this.signLanguageTimer) {
+      clearTimeout(this.signLanguageTimer);
+      this.signLanguageTimer = null;
+    }
+    if (this.signLanguageSocket) {
+      this.signLanguageSocket.close();
+      this.signLanguageSocket = null;
     }
   }
 
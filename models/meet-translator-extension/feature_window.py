@@ -0,0 +1,50 @@
+"""Fixed-size ring buffer of per-frame feature vectors"""
+
+import numpy as np
+
+
+class FeatureWindow:
+    """The last `length` feature vectors in one preallocated float32 array.
+
+    Every frame is written twice, at `pos` and `pos + length`, so the most
+    recent `length` frames are always one contiguous slice of the backing
+    array: `window()` returns that slice as a view, without copying and
+    without allocating per frame. The view is only valid until the next
+    `append()`, which callers ensure by holding the session lock until
+    inference on it has finished.
+
+    Supports `len()` and `clear()` like the list it replaces.
+    """
+
+    def __init__(self, length, feature_size):
+        self.length = length
+        self.feature_size = feature_size
+        self.data = np.zeros((2 * length, feature_size), np.float32)
+        self.pos = 0
+        self.count = 0
+
+    def append(self, features):
+        self.data[self.pos] = features
+        self.data[self.pos + self.length] = features
+        self.pos = (self.pos + 1) % self.length
+        self.count = min(self.count + 1, self.length)
+
+    def window(self):
+        """(length, feature_size) view of the frames oldest first, or None until full"""
+        if self.count < self.length:
+            return None
+        return self.data[self.pos:self.pos + self.length]
+
+    def clear(self):
+        self.pos = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __copy__(self):
+        # Sessions forked from one recognizer must not share the backing array
+        clone = FeatureWindow(self.length, self.feature_size)
+        clone.data[:] = self.data
+        clone.pos, clone.count = self.pos, self.count
+        return clone
@@ -0,0 +1,75 @@
+"""Frame decoding helpers for the sign language endpoint"""
+
+import base64
+import json
+import numpy as np
+import cv2
+
+from metrics import stage
+
+# Content types accepted as a raw encoded image body on /sign-language
+RAW_FRAME_MIMETYPES = (
+    'application/octet-stream',
+    'image/jpeg',
+    'image/webp',
+    'image/png',
+)
+
+
+def decode_frame_bytes(buf):
+    """Decode an encoded JPEG/WebP/PNG buffer straight into a BGR frame.
+
+    `buf` can be bytes, bytearray or memoryview; np.frombuffer wraps it
+    without copying so the only allocation is the decoded image itself.
+    """
+    nparr = np.frombuffer(buf, np.uint8)
+    if nparr.size == 0:
+        return None
+    with stage('imdecode'):
+        return cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+
+
+def data_url_bytes(data_url):
+    """Encoded image bytes carried by a base64 data URL"""
+    _, sep, payload = data_url.partition(',')
+    with stage('base64_decode'):
+        return base64.b64decode(payload if sep else data_url)
+
+
+def decode_data_url(data_url):
+    """Decode a base64 data URL frame (legacy JSON path)"""
+    return decode_frame_bytes(data_url_bytes(data_url))
+
+
+def read_request_bytes(request):
+    """Encoded frame bytes from a Flask request in whichever format it was sent.
+
+    Supports a raw image body, a multipart upload with a `frame` file field
+    and the original JSON `{"frame": "data:image/jpeg;base64,..."}` payload.
+    Returns None when the request carries no frame.
+    """
+    with stage('body_parse'):
+        if request.mimetype in RAW_FRAME_MIMETYPES:
+            return request.get_data(cache=False)
+
+        if request.mimetype == 'multipart/form-data':
+            frame_file = request.files.get('frame')
+            if frame_file is None:
+                return None
+            return frame_file.stream.read()
+
+        data = request.get_json(silent=True) or {}
+    image_data = data.get('frame')
+    if not image_data:
+        return None
+    return data_url_bytes(image_data)
+
+
+def stream_message_bytes(payload):
+    """Encoded image bytes of a WebSocket message: binary or JSON data URL"""
+    if isinstance(payload, str):
+        with stage('body_parse'):
+            image_data = json.loads(payload).get('frame')
+        return data_url_bytes(image_data) if image_data else None
+    return payload
+
@@ -0,0 +1,143 @@
+"""Cheap motion / hand-presence gate in front of full sign recognition"""
+
+import threading
+import time
+
+import numpy as np
+import cv2
+
+# Thumbnail the gate works on
+GATE_SIZE = (80, 60)
+# Grey-level change for a thumbnail pixel to count as moving
+PIXEL_DELTA = 12
+# Fraction of moving pixels below which a frame counts as static
+MOTION_THRESHOLD = 0.01
+# Fraction of skin-coloured pixels below which no hands can be in view.
+# This is a colour test, not a hand detector: a face in view passes it, so
+# it only fires when nobody is visible (camera covered, empty room)
+SKIN_THRESHOLD = 0.005
+# Skin range in YCrCb (Y, Cr, Cb)
+SKIN_LOWER = np.array((0, 133, 77), np.uint8)
+SKIN_UPPER = np.array((255, 173, 127), np.uint8)
+# Run full recognition at least this often even on static frames
+MAX_SKIP = 10
+
+
+def thumbnail(buf):
+    """Decode an encoded frame at 1/8 scale into a small BGR thumbnail.
+
+    JPEG decoders scale during the IDCT, so this costs a fraction of a full
+    decode. Returns None when `buf` is not an image.
+    """
+    small = cv2.imdecode(np.frombuffer(buf, np.uint8), cv2.IMREAD_REDUCED_COLOR_8)
+    if small is None:
+        return None
+    return cv2.resize(small, GATE_SIZE, interpolation=cv2.INTER_AREA)
+
+
+def motion_score(prev_gray, gray):
+    """Fraction of thumbnail pixels that changed since the last processed frame"""
+    if prev_gray is None:
+        return 1.0
+    return np.count_nonzero(cv2.absdiff(prev_gray, gray) > PIXEL_DELTA) / gray.size
+
+
+def skin_fraction(small):
+    """Fraction of thumbnail pixels in the skin colour range"""
+    mask = cv2.inRange(cv2.cvtColor(small, cv2.COLOR_BGR2YCrCb), SKIN_LOWER, SKIN_UPPER)
+    return np.count_nonzero(mask) / mask.size
+
+
+class GateState:
+    """Per-session gate memory: last processed thumbnail and response"""
+
+    def __init__(self):
+        self.prev_gray = None
+        self.last_response = None
+        self.skipped_in_row = 0
+
+
+class FrameGate:
+    """Skip frames that are static or cannot contain hands.
+
+    "Cannot contain hands" means no skin-coloured pixels at all; any face
+    in view counts as possible hands, so in a video call most of the
+    saving comes from static frames. `check()` returns the skip reason
+    (`'static'` or `'no_hands'`) or None when the frame needs full
+    recognition; callers then report the full recognition cost through
+    `processed()` so the CPU saved by skipping can be estimated.
+    """
+
+    def __init__(self, motion_threshold=MOTION_THRESHOLD, skin_threshold=SKIN_THRESHOLD,
+                 max_skip=MAX_SKIP):
+        self.motion_threshold = motion_threshold
+        self.skin_threshold = skin_threshold
+        self.max_skip = max_skip
+        self.lock = threading.Lock()
+        self.checked = 0
+        self.skipped = {'static': 0, 'no_hands': 0}
+        self.gate_seconds = 0.0
+        self.full_seconds = 0.0
+        self.full_frames = 0
+
+    def check(self, state, buf):
+        start = time.perf_counter()
+        reason = self._reason(state, buf)
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.checked += 1
+            self.gate_seconds += elapsed
+            if reason is not None:
+                self.skipped[reason] += 1
+        state.skipped_in_row = state.skipped_in_row + 1 if reason else 0
+        return reason
+
+    def _reason(self, state, buf):
+        small = thumbnail(buf)
+        if small is None:
+            return None
+        gray = cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), (3, 3), 0)
+        if state.last_response is not None and state.skipped_in_row < self.max_skip:
+            if skin_fraction(small) < self.skin_threshold:
+                state.prev_gray = gray
+                return 'no_hands'
+            if motion_score(state.prev_gray, gray) < self.motion_threshold:
+                return 'static'
+        state.prev_gray = gray
+        return None
+
+    def cached(self, state, reason):
+        """Response for a skipped frame.
+
+        Never carries a gesture: a static frame repeats the last state
+        (buffer size, hands in view) but is not a new detection, so clients
+        must not add it to the transcript again.
+        """
+        response = dict(state.last_response, gesture=None, confidence=0.0)
+        if reason == 'no_hands':
+            response['hands_detected'] = False
+        response['skipped'] = reason
+        return response
+
+    def processed(self, state, response, seconds):
+        """Remember a fully recognized frame's response and what it cost"""
+        state.last_response = response
+        with self.lock:
+            self.full_seconds += seconds
+            self.full_frames += 1
+
+    def stats(self):
+        with self.lock:
+            skipped = sum(self.skipped.values())
+            full_ms = self.full_seconds * 1000 / self.full_frames if self.full_frames else 0.0
+            gate_ms = self.gate_seconds * 1000 / self.checked if self.checked else 0.0
+            return {
+                'checked': self.checked,
+                'skipped_static': self.skipped['static'],
+                'skipped_no_hands': self.skipped['no_hands'],
+                'full_ms_avg': round(full_ms, 3),
+                'gate_ms_avg': round(gate_ms, 3),
+                # Skipped frames would have cost a full recognition each;
+                # every frame, skipped or not, paid for the gate
+                'saved_ms_est': round(skipped * full_ms - self.checked * gate_ms, 1),
+            }
@@ -0,0 +1,31 @@
+"""Gunicorn settings for the backend: pre-fork workers sharing preloaded models
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+import gc
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_WORKERS', 2))
+# The app sizes its frame and transcription pools to its share of the cores
+os.environ['WEB_WORKERS'] = str(workers)
+# WebSocket routes hold a thread for the life of the connection
+worker_class = 'gthread'
+threads = int(os.environ.get('WEB_THREADS', 16))
+# Load wsgi.py (and the models) in the master so workers share them
+preload_app = True
+# Warm-up runs before a worker answers its first request
+timeout = int(os.environ.get('WEB_TIMEOUT', 120))
+graceful_timeout = 30
+
+
+def when_ready(server):
+    # Move everything allocated so far into the permanent generation so
+    # the collector never touches (and un-shares) those pages in workers
+    gc.freeze()
+
+
+def post_worker_init(worker):
+    import wsgi
+    wsgi.server.start_worker()
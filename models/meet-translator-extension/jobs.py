@@ -0,0 +1,192 @@
+"""Persistent queue of offline transcription jobs"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+# Seconds idle job workers wait before looking for work queued by another process
+POLL_INTERVAL = 1.0
+# A running job's owner refreshes its heartbeat this often; a job whose
+# heartbeat is older than LEASE_TIMEOUT lost its owner and is queued again
+HEARTBEAT_INTERVAL = 10.0
+LEASE_TIMEOUT = 60.0
+JOB_STATES = ('queued', 'running', 'done', 'failed')
+
+
+class JobQueue:
+    """SQLite-backed job queue drained by a few worker threads.
+
+    Jobs survive restarts. Several processes may share one database; a
+    job is claimed inside an IMMEDIATE transaction so exactly one worker
+    runs it, and the claim records the queue as the job's `owner`. Each
+    queue refreshes the `heartbeat` of the jobs it is running, and a
+    `running` job whose heartbeat is older than LEASE_TIMEOUT (its process
+    died) is queued again by the next claim. `runner(job)` gets the job
+    dict and returns (result dict, audio seconds); exceptions mark the job
+    failed.
+    """
+
+    def __init__(self, path, runner, num_workers=1):
+        self.path = path
+        self.runner = runner
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.db.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        self.cond = threading.Condition()
+        self.owner = f'{os.getpid()}-{uuid.uuid4().hex[:8]}'
+        # Ids of the jobs this queue's workers are running
+        self.active = set()
+        with self.lock:
+            self.db.execute('CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, status TEXT, source TEXT, '
+                            'engine TEXT, created REAL, started REAL, finished REAL, audio_seconds REAL, '
+                            'result TEXT, error TEXT, owner TEXT, heartbeat REAL)')
+            # Databases from before leases lack the owner columns
+            columns = {row['name'] for row in self.db.execute('PRAGMA table_info(jobs)')}
+            for column, kind in (('owner', 'TEXT'), ('heartbeat', 'REAL')):
+                if column not in columns:
+                    self.db.execute(f'ALTER TABLE jobs ADD COLUMN {column} {kind}')
+        self.running = True
+        self.threads = [threading.Thread(target=self._work, name=f'job-worker-{i}', daemon=True)
+                        for i in range(num_workers)]
+        self.threads.append(threading.Thread(target=self._heartbeat, name='job-heartbeat', daemon=True))
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, source, engine=None):
+        """Queue a job for the audio file at `source`; returns its id"""
+        job_id = uuid.uuid4().hex
+        with self.lock:
+            self.db.execute('INSERT INTO jobs (id, status, source, engine, created) VALUES (?, ?, ?, ?, ?)',
+                            (job_id, 'queued', source, engine, time.time()))
+        with self.cond:
+            self.cond.notify()
+        return job_id
+
+    def get(self, job_id):
+        """Job as a dict (result decoded), or None if unknown"""
+        with self.lock:
+            row = self.db.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return self._job(row) if row is not None else None
+
+    def list(self, limit=100):
+        with self.lock:
+            rows = self.db.execute('SELECT id, status, source, engine, created, finished, audio_seconds '
+                                   'FROM jobs ORDER BY created DESC LIMIT ?', (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def wait(self, job_id, status, timeout):
+        """Block until the job's status differs from `status` or `timeout` passes"""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job['status'] != status or remaining <= 0:
+                return job
+            with self.cond:
+                self.cond.wait(min(remaining, POLL_INTERVAL))
+
+    def _claim(self):
+        with self.lock:
+            self.db.execute('BEGIN IMMEDIATE')
+            try:
+                now = time.time()
+                self.db.execute("UPDATE jobs SET status = 'queued', started = NULL, owner = NULL "
+                                "WHERE status = 'running' AND (heartbeat IS NULL OR heartbeat < ?)",
+                                (now - LEASE_TIMEOUT,))
+                row = self.db.execute("SELECT * FROM jobs WHERE status = 'queued' "
+                                      "ORDER BY created LIMIT 1").fetchone()
+                if row is not None:
+                    self.db.execute("UPDATE jobs SET status = 'running', started = ?, owner = ?, heartbeat = ? "
+                                    "WHERE id = ?", (now, self.owner, now, row['id']))
+                    self.active.add(row['id'])
+                self.db.execute('COMMIT')
+            except Exception:
+                self.db.execute('ROLLBACK')
+                raise
+        return self._job(row) if row is not None else None
+
+    def _finish(self, job_id, status, result=None, audio_seconds=None, error=None):
+        # A job whose lease expired belongs to whoever claimed it next
+        try:
+            with self.lock:
+                self.db.execute('UPDATE jobs SET status = ?, finished = ?, result = ?, audio_seconds = ?, error = ? '
+                                'WHERE id = ? AND owner = ?',
+                                (status, time.time(), json.dumps(result) if result is not None else None,
+                                 audio_seconds, error, job_id, self.owner))
+        finally:
+            self.active.discard(job_id)
+        with self.cond:
+            self.cond.notify_all()
+
+    def _work(self):
+        while self.running:
+            try:
+                job = self._claim()
+            except sqlite3.OperationalError as e:
+                # "database is locked" by another process past the busy timeout
+                print(f"Job queue busy, retrying: {e}")
+                job = None
+            if job is None:
+                with self.cond:
+                    self.cond.wait(POLL_INTERVAL)
+                continue
+            with self.cond:
+                self.cond.notify_all()
+            try:
+                try:
+                    result, audio_seconds = self.runner(job)
+                except Exception as e:
+                    print(f"Job {job['id']} failed: {e}")
+                    self._finish(job['id'], 'failed', error=str(e))
+                else:
+                    self._finish(job['id'], 'done', result, audio_seconds)
+            except sqlite3.OperationalError as e:
+                # The lease runs out and the job is retried elsewhere
+                print(f"Job {job['id']} could not be recorded: {e}")
+
+    def _heartbeat(self):
+        while self.running:
+            with self.cond:
+                self.cond.wait(HEARTBEAT_INTERVAL)
+            active = list(self.active)
+            if not active:
+                continue
+            try:
+                with self.lock:
+                    self.db.executemany("UPDATE jobs SET heartbeat = ? WHERE id = ? AND owner = ?",
+                                        [(time.time(), job_id, self.owner) for job_id in active])
+            except sqlite3.OperationalError as e:
+                print(f"Job heartbeat failed: {e}")
+
+    @staticmethod
+    def _job(row):
+        job = dict(row)
+        job['result'] = json.loads(job['result']) if job.get('result') else None
+        return job
+
+    def stats(self):
+        """Job counts by state and throughput in audio hours per wall-clock hour"""
+        with self.lock:
+            counts = dict(self.db.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+            audio, first, last = self.db.execute("SELECT SUM(audio_seconds), MIN(started), MAX(finished) "
+                                                 "FROM jobs WHERE status = 'done'").fetchone()
+        wall = (last - first) if audio else 0
+        return {
+            'jobs': {state: counts.get(state, 0) for state in JOB_STATES},
+            'audio_hours': round((audio or 0) / 3600, 2),
+            'audio_hours_per_hour': round(audio / wall, 1) if wall > 0 else None,
+        }
+
+    def stop(self):
+        self.running = False
+        with self.cond:
+            self.cond.notify_all()
+
+
+def spool_path(spool_dir, suffix=''):
+    """Fresh file path for an uploaded job body"""
+    os.makedirs(spool_dir, exist_ok=True)
+    return os.path.join(spool_dir, uuid.uuid4().hex + suffix)
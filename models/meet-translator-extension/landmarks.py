@@ -0,0 +1,33 @@
+"""Client-extracted hand landmark payloads for the sign language endpoints"""
+
+import numpy as np
+
+from batching import FEATURE_SIZE
+
+LANDMARK_DTYPES = {'float32': np.float32, 'float16': np.float16}
+
+
+class LandmarkFormatError(ValueError):
+    """The body is not a whole number of little-endian feature vectors"""
+
+
+def parse_landmarks(buf, dtype='float32', feature_size=FEATURE_SIZE):
+    """Decode a landmark body into a list of per-frame float32 feature vectors.
+
+    The body is one or more frames back to back, each `feature_size`
+    little-endian float16 or float32 values in the order the recognizer's
+    `extract_features()` produces. A frame of all zeros means no hands
+    were visible; such rows come back as None in the returned list.
+    """
+    if dtype not in LANDMARK_DTYPES:
+        raise LandmarkFormatError(f"dtype must be one of {', '.join(LANDMARK_DTYPES)}")
+    item = np.dtype(LANDMARK_DTYPES[dtype]).newbyteorder('<')
+    frame_bytes = feature_size * item.itemsize
+    if not buf or len(buf) % frame_bytes:
+        raise LandmarkFormatError(
+            f"expected a multiple of {frame_bytes} bytes ({feature_size} {dtype} values per frame), "
+            f"got {len(buf)}")
+    frames = np.frombuffer(buf, item).reshape(-1, feature_size).astype(np.float32)
+    if not np.isfinite(frames).all():
+        raise LandmarkFormatError("landmarks contain NaN or infinite values")
+    return [frame if frame.any() else None for frame in frames]
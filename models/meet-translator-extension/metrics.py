@@ -0,0 +1,183 @@
+"""Request counters and per-stage latency histograms in Prometheus text format"""
+
+import bisect
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Histogram bucket upper bounds in seconds, from sub-millisecond decodes to
+# long recognitions
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Endpoint the current thread is serving; stage timings are filed under it
+current_endpoint = contextvars.ContextVar('current_endpoint', default=None)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+
+    def sample_labels(self, sample_name):
+        return self.labels
+
+
+class Counter(_Metric):
+    """Monotonic count per label combination"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        super().__init__(name, help, labels)
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            return [(self.name, labels, value) for labels, value in sorted(self.values.items())]
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts, sum and count per label combination"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        self.series = {}
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def samples(self):
+        with self.lock:
+            series = sorted((labels, list(counts), total) for labels, (counts, total) in self.series.items())
+        samples = []
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                samples.append((self.name + '_bucket', labels + (bound,), cumulative))
+            samples.append((self.name + '_sum', labels, total))
+            samples.append((self.name + '_count', labels, cumulative))
+        return samples
+
+    def sample_labels(self, sample_name):
+        return self.labels + ('le',) if sample_name.endswith('_bucket') else self.labels
+
+
+class Gauge(_Metric):
+    """Value read at scrape time: `read()` returns {label values tuple: value}"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, help, read, labels=()):
+        super().__init__(name, help, labels)
+        self.read = read
+
+    def samples(self):
+        try:
+            values = self.read()
+        except Exception:
+            # A component that is not loaded yet has nothing to report
+            return []
+        return [(self.name, labels, value) for labels, value in sorted(values.items())]
+
+
+class Registry:
+    """Metrics exposed together on /metrics.
+
+    Every sample carries a `worker` label with the serving process's pid:
+    under a pre-fork server each scrape reaches one worker, and its
+    counters only stay monotonic as a series of their own. Sum across
+    the label to aggregate.
+    """
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self.register(Counter(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def gauge(self, name, help, read, labels=()):
+        return self.register(Gauge(name, help, read, labels))
+
+    def render(self):
+        # Read at scrape time: the registry is created before workers fork
+        worker = str(os.getpid())
+        lines = []
+        for metric in self.metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                value = value if isinstance(value, int) else repr(float(value))
+                names = ('worker',) + metric.sample_labels(name)
+                lines.append(f'{name}{_labels(names, (worker,) + labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+stage_seconds = registry.histogram(
+    'backend_stage_seconds', 'Time spent in each processing stage of a request', ('endpoint', 'stage'))
+
+
+@contextmanager
+def serving(endpoint):
+    """File stage timings in this block under `endpoint`"""
+    token = current_endpoint.set(endpoint)
+    try:
+        yield
+    finally:
+        current_endpoint.reset(token)
+
+
+def observe_stage(stage, seconds):
+    """Record a stage duration for the current endpoint; ignored outside a request"""
+    endpoint = current_endpoint.get()
+    if endpoint is not None:
+        stage_seconds.observe(seconds, endpoint, stage)
+
+
+@contextmanager
+def stage(name):
+    """Time the enclosed block as stage `name` of the current request"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(name, time.perf_counter() - start)
@@ -0,0 +1,69 @@
+"""Capture settings the backend recommends to clients based on its load"""
+
+import threading
+from contextlib import contextmanager
+
+# Side of the square image the hand landmark model runs on
+MODEL_INPUT_SIDE = 224
+# Hands fill roughly a third of a webcam frame, so frames much larger than
+# this many model inputs across only add upload and decode cost
+FRAME_TO_MODEL = 3
+# Client frame interval when the server keeps up, and the slowest we ask for
+BASE_INTERVAL_MS = 300
+MAX_INTERVAL_MS = 1500
+# JPEG quality when idle and under heavy load
+BASE_QUALITY = 0.7
+MIN_QUALITY = 0.5
+# In-flight frames per unit of capacity we aim for
+TARGET_LOAD = 0.75
+# Weight of the newest sample in the load moving average
+LOAD_SMOOTHING = 0.2
+
+
+class CaptureAdvisor:
+    """Track frames in flight and turn the load into a capture hint.
+
+    `capacity` is how many frames the backend can work on at once (worker
+    processes, or 1 when extraction is serialized in-process). The hint
+    stretches the client's frame interval in proportion to the smoothed
+    load above TARGET_LOAD and shrinks resolution and JPEG quality toward
+    what the landmark model actually uses.
+    """
+
+    def __init__(self, capacity=1, model_side=MODEL_INPUT_SIDE):
+        self.capacity = max(capacity, 1)
+        self.model_side = model_side
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.load = 0.0
+
+    @contextmanager
+    def track(self):
+        with self.lock:
+            self.in_flight += 1
+            self._sample()
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+                self._sample()
+
+    def _sample(self):
+        current = self.in_flight / self.capacity
+        self.load += LOAD_SMOOTHING * (current - self.load)
+
+    def hint(self):
+        with self.lock:
+            pressure = max(self.load / TARGET_LOAD, 1.0)
+        interval = min(BASE_INTERVAL_MS * pressure, MAX_INTERVAL_MS)
+        # Never ask for less than twice the model input so a hand still
+        # covers enough pixels after cropping
+        side = max(self.model_side * FRAME_TO_MODEL / pressure, self.model_side * 2)
+        quality = max(BASE_QUALITY - 0.1 * (pressure - 1), MIN_QUALITY)
+        return {
+            'interval_ms': int(interval),
+            'max_side': int(side),
+            'quality': round(quality, 2),
+            'load': round(self.load, 2),
+        }
@@ -0,0 +1,177 @@
+"""Per-client sign language sessions sharing one loaded recognizer"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from gating import GateState
+from admission import check_deadline
+from metrics import stage
+
+# Sessions idle for longer than this are dropped
+SESSION_TTL = 60.0
+# Upper bound on live sessions; the least recently used one is evicted
+MAX_SESSIONS = 500
+
+
+def fork_recognizer(base):
+    """Shallow-copy a GestureRecognizer so weights are shared but buffers are not.
+
+    The model and MediaPipe objects stay shared with `base`; every list,
+    deque or dict attribute (the temporal `feature_buffer` among them) is
+    copied so per-frame state lives with the session.
+    """
+    session_recognizer = copy.copy(base)
+    for name, value in vars(base).items():
+        if isinstance(value, (list, deque, dict)):
+            setattr(session_recognizer, name, copy.copy(value))
+    session_recognizer.feature_buffer.clear()
+    return session_recognizer
+
+
+class SignSession:
+    """Recognition state owned by one client"""
+
+    def __init__(self, session_id, recognizer):
+        self.session_id = session_id
+        self.recognizer = recognizer
+        self.lock = threading.Lock()
+        self.last_seen = time.monotonic()
+        self.gate = GateState()
+
+
+class SessionManager:
+    """Session registry with idle TTL and an LRU cap"""
+
+    def __init__(self, base_recognizer, ttl=SESSION_TTL, max_sessions=MAX_SESSIONS,
+                 stages=None, scheduler=None, pool=None):
+        self.base_recognizer = base_recognizer
+        # With stages + scheduler, model inference is batched across sessions
+        self.stages = stages
+        self.scheduler = scheduler
+        # With stages + pool, decoding and landmark extraction run in workers
+        self.pool = pool
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+        # The shared model/MediaPipe graph is not thread-safe
+        self.model_lock = threading.Lock()
+        self.evicted = 0
+
+    def get(self, session_id):
+        """Return the session for `session_id`, creating it if needed"""
+        now = time.monotonic()
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                session = SignSession(session_id, fork_recognizer(self.base_recognizer))
+                if self.stages is not None:
+                    # Split pipeline owns the window: keep it in a ring buffer
+                    session.recognizer.feature_buffer = self.stages.new_window()
+                self.sessions[session_id] = session
+            else:
+                self.sessions.move_to_end(session_id)
+            session.last_seen = now
+            self._evict(now)
+            return session
+
+    def remove(self, session_id):
+        with self.lock:
+            self.sessions.pop(session_id, None)
+
+    def process_frame(self, session, frame, deadline=None):
+        """Run a frame through the session's recognizer.
+
+        Raises DeadlineExceeded when `deadline` passes before the frame's
+        turn comes, so stale frames are dropped instead of processed late.
+        """
+        if self.stages is None:
+            with session.lock, self.model_lock:
+                check_deadline(deadline)
+                # Extraction and inference happen inside the recognizer here
+                with stage('process_frame'):
+                    return session.recognizer.process_frame(frame)
+
+        with session.lock:
+            with self.model_lock:
+                check_deadline(deadline)
+                with stage('landmark_extraction'):
+                    features = self.stages.extract_features(frame)
+            return self._infer(session, features, deadline)
+
+    def process_encoded(self, session, buf, deadline=None):
+        """Run an encoded frame through the worker pool and the session's window.
+
+        Returns None when the bytes do not decode to an image.
+        """
+        with session.lock:
+            check_deadline(deadline)
+            decoded, features = self.pool.extract(buf, deadline)
+            if not decoded:
+                return None
+            return self._infer(session, features, deadline)
+
+    def process_landmarks(self, session, frames, deadline=None):
+        """Push client-extracted feature vectors through the session's window.
+
+        `frames` is a list of feature vectors (None where no hands were
+        visible), oldest first; only sequence inference runs here, and only
+        for the last frame, whose result is returned.
+        """
+        with session.lock:
+            for features in frames[:-1]:
+                if features is None:
+                    session.recognizer.feature_buffer.clear()
+                else:
+                    self.stages.push(session.recognizer.feature_buffer, features)
+            check_deadline(deadline)
+            return self._infer(session, frames[-1], deadline)
+
+    def _infer(self, session, features, deadline=None):
+        if features is None:
+            # As in the recognizer's own process_frame, a frame without
+            # hands ends the gesture: windows never span a gap
+            session.recognizer.feature_buffer.clear()
+            return None, 0.0, None
+        window = self.stages.push(session.recognizer.feature_buffer, features)
+        if window is None:
+            return None, 0.0, None
+        with stage('inference'):
+            if self.scheduler is not None:
+                probs = self.scheduler.submit(window, deadline).result()
+            else:
+                with self.model_lock:
+                    probs = self.stages.predict_batch(window[np.newaxis])[0]
+        gesture, confidence = self.stages.decode(probs)
+        return gesture, confidence, probs
+
+    def warm_up(self, width=640, height=480):
+        """Run a blank frame and a dummy window through the shared recognizer.
+
+        MediaPipe builds its graph and the model allocates its kernels on
+        first use; doing it here keeps that cost off the first request.
+        """
+        recognizer = fork_recognizer(self.base_recognizer)
+        blank = np.zeros((height, width, 3), np.uint8)
+        with self.model_lock:
+            if self.stages is None:
+                recognizer.process_frame(blank)
+                return
+            self.stages.extract_features(blank)
+            self.stages.warm_up()
+
+    def _evict(self, now):
+        # Oldest-first order means expired sessions sit at the front
+        while self.sessions:
+            session_id, session = next(iter(self.sessions.items()))
+            if len(self.sessions) <= self.max_sessions and now - session.last_seen < self.ttl:
+                break
+            del self.sessions[session_id]
+            self.evicted += 1
+
+    def __len__(self):
+        return len(self.sessions)
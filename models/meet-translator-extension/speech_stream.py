@@ -0,0 +1,150 @@
+"""WebSocket streaming session for speech-to-text with partial results"""
+
+import json
+import time
+from collections import deque
+
+import numpy as np
+from simple_websocket import ConnectionClosed
+
+SAMPLE_RATE = 16000
+# RMS level of 16-bit samples above which a chunk counts as speech
+# (SpeechRecognition's default energy_threshold)
+ENERGY_THRESHOLD = 300
+# Trailing silence that ends an utterance
+ENDPOINT_SILENCE = 0.5
+# Utterances are cut here even without a pause
+MAX_UTTERANCE = 15.0
+# Silent chunks kept before speech so word onsets are not clipped
+PREROLL_CHUNKS = 3
+
+
+def chunk_rms(pcm):
+    samples = np.frombuffer(pcm, np.int16).astype(np.float32)
+    return float(np.sqrt(np.mean(samples * samples))) if samples.size else 0.0
+
+
+class UtteranceTracker:
+    """Feed PCM chunks to an engine stream and decide where utterances end.
+
+    Silence before speech is held back (apart from a short pre-roll) so
+    the engine only decodes voiced audio. `push()` returns a list of
+    `(kind, text)` events where kind is 'partial' or 'final'.
+    """
+
+    def __init__(self, stream, threshold=ENERGY_THRESHOLD,
+                 endpoint_silence=ENDPOINT_SILENCE, max_utterance=MAX_UTTERANCE):
+        self.stream = stream
+        self.threshold = threshold
+        self.endpoint_silence = endpoint_silence
+        self.max_utterance = max_utterance
+        self.preroll = deque(maxlen=PREROLL_CHUNKS)
+        self.in_speech = False
+        self.silent_for = 0.0
+        self.speech_for = 0.0
+        self.last_partial = ''
+
+    def push(self, pcm):
+        duration = len(pcm) / 2 / SAMPLE_RATE
+        voiced = chunk_rms(pcm) > self.threshold
+        if not self.in_speech:
+            if not voiced:
+                self.preroll.append(pcm)
+                return []
+            self.in_speech = True
+            for held in self.preroll:
+                self.stream.feed(held)
+            self.preroll.clear()
+
+        events = []
+        partial = self.stream.feed(pcm)
+        if partial and partial != self.last_partial:
+            self.last_partial = partial
+            events.append(('partial', partial))
+
+        self.speech_for += duration
+        self.silent_for = 0.0 if voiced else self.silent_for + duration
+        if self.silent_for >= self.endpoint_silence or self.speech_for >= self.max_utterance:
+            events.append(('final', self.finish()))
+        return events
+
+    def finish(self):
+        """End the current utterance and return its final text"""
+        self.in_speech = False
+        self.silent_for = self.speech_for = 0.0
+        self.last_partial = ''
+        return self.stream.finish()
+
+
+def serve_speech_stream(ws, stream, engine_name, normalizer=None, record=None):
+    """Run one speech session until the client disconnects.
+
+    Binary messages are 16 kHz 16-bit mono PCM chunks (~100 ms each works
+    well), or PCM in another format that `normalizer` converts. A text
+    message `{"event": "end"}` flushes the current utterance, including
+    the audio still inside the normalizer. The server sends
+    `{"type": "partial", ...}` whenever the hypothesis changes and
+    `{"type": "final", ...}` at each endpoint; both carry the utterance
+    number. `record(result, start)` is called once per client message,
+    with `{'error': ...}` as the result when handling it failed.
+    """
+    tracker = UtteranceTracker(stream)
+    utterance = 0
+
+    def send(kind, text):
+        nonlocal utterance
+        message = {'type': kind, 'utterance': utterance, 'text': text or None, 'engine': engine_name}
+        if kind == 'final':
+            message['status'] = 'success' if text else 'no_speech'
+            utterance += 1
+        ws.send(json.dumps(message))
+
+    def flush():
+        # The resampler holds back a few ms of audio; it belongs to the
+        # utterance being finished
+        events = []
+        if normalizer is not None:
+            tail = normalizer.flush()
+            if tail:
+                events = tracker.push(tail)
+        if tracker.in_speech:
+            events.append(('final', tracker.finish()))
+        return events
+
+    def handle(message):
+        try:
+            if isinstance(message, str):
+                if json.loads(message).get('event') == 'end':
+                    for kind, text in flush():
+                        send(kind, text)
+                return {}
+            if normalizer is not None:
+                message = normalizer.push(message)
+                if not message:
+                    return {}
+            for kind, text in tracker.push(message):
+                send(kind, text)
+            return {}
+        except ConnectionClosed:
+            raise
+        except Exception as e:
+            print(f"Speech stream error: {e}")
+            ws.send(json.dumps({'type': 'error', 'utterance': utterance, 'error': str(e)}))
+            return {'error': str(e)}
+
+    try:
+        while True:
+            message = ws.receive()
+            start = time.perf_counter()
+            result = {'error': 'connection closed'}
+            try:
+                result = handle(message)
+            finally:
+                if record is not None:
+                    record(result, start)
+    except ConnectionClosed:
+        # Nobody is left to send a final to: the stream is closed without
+        # recognizing the open utterance
+        pass
+    finally:
+        stream.close()
@@ -0,0 +1,56 @@
+"""Startup phase timing and model loading status"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupProfile:
+    """Wall time of each startup phase and where model loading stands.
+
+    `status` goes from 'starting' to 'loading' while models load (possibly
+    in the background) and ends 'ready'; a phase that raises is recorded
+    with its error and the load continues with the next one.
+    """
+
+    def __init__(self, started=None):
+        self.started = started if started is not None else time.perf_counter()
+        self.lock = threading.Lock()
+        self.status = 'starting'
+        self.phases = {}
+        self.errors = {}
+        self.ready_after = None
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            with self.lock:
+                self.errors[name] = str(e)
+            raise
+        finally:
+            with self.lock:
+                self.phases[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    def mark(self, name):
+        """Record the time from process start to now as phase `name`"""
+        with self.lock:
+            self.phases[name] = round((time.perf_counter() - self.started) * 1000, 1)
+        return self.phases[name]
+
+    def set_status(self, status):
+        with self.lock:
+            self.status = status
+            if status == 'ready':
+                self.ready_after = round((time.perf_counter() - self.started) * 1000, 1)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'status': self.status,
+                'phases_ms': dict(self.phases),
+                'errors': dict(self.errors),
+                'ready_after_ms': self.ready_after,
+            }
@@ -0,0 +1,93 @@
+"""WebSocket streaming session for sign language frames"""
+
+import json
+import threading
+from collections import deque
+
+from simple_websocket import ConnectionClosed
+
+from metrics import stage
+
+# Frames waiting for the recognizer per session; older frames are dropped
+# first when the client sends faster than recognition keeps up
+STREAM_QUEUE_SIZE = 2
+
+
+class FrameStream:
+    """Bounded drop-oldest queue of (seq, payload) frames for one session"""
+
+    def __init__(self, maxlen=STREAM_QUEUE_SIZE):
+        self.frames = deque(maxlen=maxlen)
+        self.cond = threading.Condition()
+        self.closed = False
+        self.received = 0
+        self.dropped = 0
+
+    def put(self, payload):
+        with self.cond:
+            if len(self.frames) == self.frames.maxlen:
+                self.dropped += 1
+            self.frames.append((self.received, payload))
+            self.received += 1
+            self.cond.notify()
+
+    def get(self):
+        """Block until a frame is queued; returns None once the stream closed"""
+        with self.cond:
+            while not self.frames and not self.closed:
+                self.cond.wait()
+            if not self.frames:
+                return None
+            return self.frames.popleft()
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+
+def _read_frames(ws, stream):
+    """Reader thread: move incoming messages into the session queue"""
+    try:
+        while True:
+            stream.put(ws.receive())
+    except ConnectionClosed:
+        pass
+    finally:
+        stream.close()
+
+
+def serve_frame_stream(ws, handle_frame, maxlen=STREAM_QUEUE_SIZE):
+    """Run one streaming session until the client disconnects.
+
+    Binary messages are encoded images, text messages are JSON with a
+    `frame` data URL. Frames are processed strictly in arrival order and
+    each result is sent back tagged with the frame's `seq` and the running
+    count of frames dropped under backpressure. `handle_frame(payload)`
+    must return a JSON-serializable dict.
+    """
+    stream = FrameStream(maxlen)
+    reader = threading.Thread(target=_read_frames, args=(ws, stream), daemon=True)
+    reader.start()
+
+    while True:
+        item = stream.get()
+        if item is None:
+            break
+        seq, payload = item
+        try:
+            result = handle_frame(payload)
+        except Exception as e:
+            print(f"Stream error: {e}")
+            result = {'error': str(e)}
+        result['seq'] = seq
+        result['dropped'] = stream.dropped
+        try:
+            with stage('json_encode'):
+                message = json.dumps(result)
+            ws.send(message)
+        except ConnectionClosed:
+            break
+
+    stream.close()
+    reader.join(timeout=1)
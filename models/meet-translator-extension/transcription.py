@@ -0,0 +1,112 @@
+"""Parallel recognition of long audio split at silence"""
+
+import multiprocessing as mp
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+from admission import DeadlineExceeded
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+# Longest chunk a long upload is cut into; shorter chunks spread better
+# across workers but give the recognizer less context
+TRANSCRIBE_CHUNK_MS = 15000
+
+
+def load_speech_registry(speech_dir, default, preload):
+    """Worker-side loader for the shared speech engine registry"""
+    sys.path.append(speech_dir)
+    from engines import EngineRegistry
+    return EngineRegistry(default, preload)
+
+
+# Recognizer owned by a pool worker process
+_recognizer = None
+
+
+def _init_worker(loader, loader_args):
+    global _recognizer
+    _recognizer = loader(*loader_args)
+
+
+def _ready():
+    """Worker task that only proves the worker has started and loaded its engines"""
+    return _recognizer is not None
+
+
+def _recognize(pcm, engine_name):
+    """Worker task: (text, engine) for one chunk; text is None when the engine found no speech"""
+    import speech_recognition as sr  # type: ignore
+    try:
+        return _recognizer.recognize(sr.AudioData(pcm, SAMPLE_RATE, SAMPLE_WIDTH), engine_name)
+    except sr.UnknownValueError as e:
+        return None, getattr(e, 'engine', None)
+
+
+class TranscriptionPool:
+    """Worker processes that each hold their own speech engines.
+
+    The local decoder serializes its callers and network engines wait on
+    I/O, so one recognizer per process is what lets chunks of a long
+    upload be recognized at the same time. `loader(*loader_args)` builds
+    the recognizer in each worker and must return an object whose
+    `recognize(audio, engine_name)` returns (text, engine name). Workers
+    are started, and load their engines, when the pool is created rather
+    than on the first request that needs them.
+    """
+
+    def __init__(self, loader, loader_args=(), num_workers=2):
+        self.num_workers = num_workers
+        self.executor = ProcessPoolExecutor(num_workers, mp_context=mp.get_context('spawn'),
+                                            initializer=_init_worker, initargs=(loader, loader_args))
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.chunks = 0
+        self.audio_seconds = 0.0
+        self.wall_seconds = 0.0
+        # The executor only spawns a process when a task finds no idle
+        # one, so one task per worker starts them all; nothing waits here
+        for _ in range(num_workers):
+            self.executor.submit(_ready)
+
+    def recognize(self, chunks, engine_name=None, deadline=None):
+        """Recognize PCM chunks concurrently; returns [(text, engine)] in chunk order.
+
+        Raises DeadlineExceeded (and cancels what has not started) when
+        `deadline` passes first; recognizer errors propagate as raised.
+        """
+        start = time.monotonic()
+        # Views of the request buffer cannot be pickled; this is the one
+        # copy the hand-off to another process needs
+        futures = [self.executor.submit(_recognize, bytes(chunk), engine_name) for chunk in chunks]
+        try:
+            results = []
+            for future in futures:
+                timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+                results.append(future.result(timeout))
+        except FutureTimeout:
+            raise DeadlineExceeded("deadline exceeded during transcription", 1)
+        finally:
+            for future in futures:
+                future.cancel()
+        with self.lock:
+            self.requests += 1
+            self.chunks += len(chunks)
+            self.audio_seconds += sum(len(chunk) for chunk in chunks) / (SAMPLE_RATE * SAMPLE_WIDTH)
+            self.wall_seconds += time.monotonic() - start
+        return results
+
+    def stats(self):
+        with self.lock:
+            return {
+                'workers': self.num_workers,
+                'requests': self.requests,
+                'chunks': self.chunks,
+                'audio_seconds': round(self.audio_seconds, 1),
+                'realtime_factor': round(self.audio_seconds / self.wall_seconds, 1) if self.wall_seconds else None,
+            }
+
+    def stop(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,60 @@
+"""Voice activity trimming for uploaded /speech-to-text audio"""
+
+import threading
+
+import numpy as np
+
+from vad import speech_spans, MAX_SEGMENT_MS
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+
+
+class SpeechTrimmer:
+    """Cut uploads down to their voiced chunks and count what was skipped.
+
+    `split(pcm)` returns the 16 kHz 16-bit PCM chunks to recognize, each
+    trimmed of leading/trailing silence and split at pauses; an empty list
+    means the upload was silent and needs no recognition at all.
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.silent = 0
+        self.chunks = 0
+        self.seconds_in = 0.0
+        self.seconds_kept = 0.0
+
+    def split(self, pcm):
+        return [chunk for _, _, chunk in self.segments(pcm)]
+
+    def segments(self, pcm, max_chunk_ms=MAX_SEGMENT_MS):
+        """Voiced chunks of at most `max_chunk_ms` as (start s, end s, pcm).
+
+        Each chunk's pcm is a memoryview into `pcm`, not a copy.
+        """
+        # Odd trailing byte from a truncated upload cannot be a sample
+        samples = np.frombuffer(pcm, np.int16, count=len(pcm) // SAMPLE_WIDTH)
+        spans = speech_spans(samples, self.sample_rate, max_chunk_ms)
+        view = memoryview(pcm).cast('B')
+        segments = [(start / self.sample_rate, end / self.sample_rate,
+                     view[start * SAMPLE_WIDTH:end * SAMPLE_WIDTH]) for start, end in spans]
+        with self.lock:
+            self.requests += 1
+            self.silent += not segments
+            self.chunks += len(segments)
+            self.seconds_in += len(samples) / self.sample_rate
+            self.seconds_kept += sum(end - start for start, end in spans) / self.sample_rate
+        return segments
+
+    def stats(self):
+        with self.lock:
+            return {
+                'requests': self.requests,
+                'rejected_silent': self.silent,
+                'chunks': self.chunks,
+                'audio_seconds_in': round(self.seconds_in, 1),
+                'audio_seconds_saved': round(self.seconds_in - self.seconds_kept, 1),
+            }
@@ -0,0 +1,279 @@
+"""Process pool for frame decoding and hand-landmark extraction"""
+
+import atexit
+import multiprocessing as mp
+import os
+import queue
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+import cv2
+
+from admission import DeadlineExceeded
+from metrics import observe_stage
+
+# Largest encoded frame a worker's shared-memory slot holds by default; the
+# server sizes slots from its upload limit instead
+SLOT_SIZE = 4 * 1024 * 1024
+# Seconds to wait for all of a pool's workers to load their recognizers;
+# under gunicorn this happens in post_worker_init, so it stays below the
+# default 120 s worker timeout
+START_TIMEOUT = 90.0
+# Seconds one frame may take before the worker is considered hung
+FRAME_TIMEOUT = 10.0
+
+
+def available_cores():
+    """CPU cores this process may run on"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def process_cores():
+    """This server process's share of the cores: WEB_WORKERS processes split them"""
+    web_workers = max(int(os.environ.get('WEB_WORKERS', 1)), 1)
+    return max(available_cores() // web_workers, 1)
+
+
+def auto_workers():
+    """One worker per core of this process's share, leaving one for the Flask front end"""
+    return max(process_cores() - 1, 0)
+
+
+def load_gesture_recognizer(sign_dir, language):
+    """Worker-side loader for the project's GestureRecognizer"""
+    os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+    os.environ['CUDA_VISIBLE_DEVICES'] = '-1'
+    sys.path.append(sign_dir)
+    from core.gesture_recognizer import GestureRecognizer
+    return GestureRecognizer(language=language)
+
+
+def _worker_main(conn, shm_name, loader, loader_args):
+    """Worker loop: decode the frame in shared memory and extract its features.
+
+    Replies to each request with (decoded, features, (decode seconds,
+    extraction seconds)); `features` is None when no hands were found.
+    A frame the extractor fails on is answered with decoded None and the
+    error message in place of the features, and the worker carries on.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        extractor = loader(*loader_args)
+    except Exception as e:
+        conn.send(('error', str(e)))
+        return
+    conn.send(('ready', os.getpid()))
+
+    try:
+        while True:
+            size = conn.recv()
+            if size is None:
+                break
+            # View the encoded bytes in place; imdecode allocates only the image
+            start = time.perf_counter()
+            frame = cv2.imdecode(np.ndarray((size,), np.uint8, shm.buf), cv2.IMREAD_COLOR)
+            decoded = time.perf_counter()
+            if frame is None:
+                conn.send((False, None, (decoded - start, 0.0)))
+                continue
+            try:
+                features = extractor.extract_features(frame)
+            except Exception as e:
+                conn.send((None, str(e), (decoded - start, time.perf_counter() - decoded)))
+                continue
+            if features is not None:
+                features = np.asarray(features, dtype=np.float32)
+            conn.send((True, features, (decoded - start, time.perf_counter() - decoded)))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        shm.close()
+
+
+class WorkerError(RuntimeError):
+    """A worker died or hung while handling a frame, or none became free in time"""
+
+
+class ExtractionError(RuntimeError):
+    """The recognizer failed on one frame; the worker that ran it is still usable"""
+
+
+class _Worker:
+    """One worker process with its own shared-memory input slot"""
+
+    def __init__(self, ctx, loader, loader_args, slot_size):
+        self.shm = shared_memory.SharedMemory(create=True, size=slot_size)
+        self.ctx = ctx
+        self.loader = loader
+        self.loader_args = loader_args
+        self.process = None
+        self.conn = None
+
+    def start(self, timeout=START_TIMEOUT):
+        self.launch()
+        self.wait_ready(time.monotonic() + timeout)
+
+    def launch(self):
+        parent_conn, child_conn = self.ctx.Pipe()
+        self.process = self.ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self.shm.name, self.loader, self.loader_args),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+    def wait_ready(self, deadline):
+        if not self.conn.poll(max(deadline - time.monotonic(), 0)):
+            self.kill()
+            raise WorkerError("worker did not start in time")
+        status, detail = self.conn.recv()
+        if status != 'ready':
+            self.kill()
+            raise WorkerError(f"worker failed to start: {detail}")
+
+    def extract(self, buf, timeout):
+        size = len(buf)
+        if size > self.shm.size:
+            raise ValueError(f"frame of {size} bytes exceeds the {self.shm.size} byte slot")
+        self.shm.buf[:size] = buf
+        try:
+            self.conn.send(size)
+            if not self.conn.poll(timeout):
+                raise WorkerError("worker timed out")
+            return self.conn.recv()
+        except (EOFError, OSError) as e:
+            raise WorkerError(f"worker crashed: {e}")
+
+    def alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def kill(self):
+        if self.process is not None and self.process.is_alive():
+            self.process.kill()
+        if self.process is not None:
+            self.process.join(timeout=1)
+        if self.conn is not None:
+            self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, AttributeError):
+            pass
+        if self.process is not None:
+            self.process.join(timeout=2)
+        self.kill()
+        self.shm.close()
+        self.shm.unlink()
+
+
+class FramePool:
+    """Worker processes that each hold their own recognizer instance.
+
+    `loader(*loader_args)` runs in every worker and must return an object
+    with `extract_features(frame)`. Encoded frames are copied into the
+    chosen worker's shared-memory slot and decoded there, so image arrays
+    never cross the process boundary; only the small feature vector comes
+    back. A worker that crashes or hangs is replaced in the background.
+    Workers are stopped and their shared memory released at interpreter
+    exit.
+    """
+
+    def __init__(self, loader, loader_args=(), num_workers=None,
+                 slot_size=SLOT_SIZE, frame_timeout=FRAME_TIMEOUT, start_timeout=START_TIMEOUT):
+        if num_workers is None:
+            num_workers = auto_workers()
+        self.frame_timeout = frame_timeout
+        self.ctx = mp.get_context('spawn')
+        self.workers = [_Worker(self.ctx, loader, loader_args, slot_size) for _ in range(num_workers)]
+        self.idle = queue.Queue()
+        self.restarts = 0
+        self.failures = 0
+        self.stopped = False
+        try:
+            # Workers load their recognizers concurrently, under one deadline
+            for worker in self.workers:
+                worker.launch()
+            deadline = time.monotonic() + start_timeout
+            for worker in self.workers:
+                worker.wait_ready(deadline)
+                self.idle.put(worker)
+        except Exception:
+            self.stop()
+            raise
+        atexit.register(self.stop)
+
+    def extract(self, buf, deadline=None):
+        """Return (decoded, features) for an encoded frame.
+
+        Waits at most `frame_timeout`, or until `deadline`, for a free
+        worker; raises DeadlineExceeded or WorkerError when none frees up,
+        and ExtractionError when the recognizer fails on this frame.
+        """
+        timeout = self.frame_timeout
+        if deadline is not None:
+            timeout = min(timeout, max(deadline - time.monotonic(), 0))
+        try:
+            worker = self.idle.get(timeout=timeout)
+        except queue.Empty:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise DeadlineExceeded("deadline exceeded waiting for a frame worker", 1)
+            raise WorkerError("no frame worker became free in time")
+        try:
+            decoded, features, (decode_time, extract_time) = worker.extract(buf, self.frame_timeout)
+        except WorkerError:
+            self.failures += 1
+            threading.Thread(target=self._restart, args=(worker,), daemon=True).start()
+            raise
+        except BaseException:
+            self.idle.put(worker)
+            raise
+        self.idle.put(worker)
+        if decoded is None:
+            raise ExtractionError(f"landmark extraction failed: {features}")
+        # Timed in the worker process, recorded here for the calling request
+        observe_stage('imdecode', decode_time)
+        if decoded:
+            observe_stage('landmark_extraction', extract_time)
+        return decoded, features
+
+    def _restart(self, worker):
+        worker.kill()
+        while not self.stopped:
+            try:
+                worker.start()
+                break
+            except WorkerError as e:
+                print(f"Worker restart failed: {e}")
+                time.sleep(1)
+        else:
+            return
+        self.restarts += 1
+        self.idle.put(worker)
+
+    def health(self):
+        return {
+            'workers': len(self.workers),
+            'alive': sum(worker.alive() for worker in self.workers),
+            'idle': self.idle.qsize(),
+            'restarts': self.restarts,
+            'failures': self.failures,
+        }
+
+    def stop(self):
+        if self.stopped:
+            return
+        self.stopped = True
+        for worker in self.workers:
+            worker.stop()
+
+    def __len__(self):
+        return len(self.workers)
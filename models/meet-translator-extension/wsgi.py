@@ -0,0 +1,19 @@
+"""WSGI entry point for production servers
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The models are loaded when this module is imported; with the gunicorn
+config that happens once in the master, before workers are forked, and
+each worker starts its own sessions and pools in `post_worker_init`.
+Single-process servers should set SERVER_PREFORK=0 so the app is fully
+started on import.
+"""
+
+import os
+import sys
+from importlib import import_module
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+server = import_module('backend-server')
+app = server.create_app(start=os.environ.get('SERVER_PREFORK', '1') == '0')
@@ -0,0 +1,198 @@
+"""Pluggable speech recognition engines shared by the app and the backend"""
+
+import threading
+
+import speech_recognition as sr  # type: ignore
+
+# Engine used when none is requested
+DEFAULT_ENGINE = 'google'
+# Local engine tried when the requested one cannot reach its service
+FALLBACK_ENGINE = 'sphinx'
+# Sample format every engine is fed
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+
+
+class UtteranceStream:
+    """Streaming wrapper for engines without partial results.
+
+    Chunks are buffered and the whole utterance is recognized when the
+    caller reaches an endpoint, so only final results are produced.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.chunks = []
+
+    def feed(self, pcm):
+        """Add 16 kHz 16-bit PCM; returns the partial hypothesis (none here)"""
+        self.chunks.append(pcm)
+        return None
+
+    def finish(self):
+        """Final text of the utterance ('' when nothing was recognized)"""
+        pcm, self.chunks = b''.join(self.chunks), []
+        if not pcm:
+            return ''
+        try:
+            return self.engine.recognize(sr.AudioData(pcm, SAMPLE_RATE, SAMPLE_WIDTH))
+        except sr.UnknownValueError:
+            return ''
+
+    def close(self):
+        self.chunks = []
+
+
+class GoogleEngine:
+    """Google Web Speech API through SpeechRecognition (needs network)"""
+
+    name = 'google'
+
+    def __init__(self):
+        self.recognizer = sr.Recognizer()
+
+    def recognize(self, audio):
+        return self.recognizer.recognize_google(audio)
+
+    def stream(self):
+        return UtteranceStream(self)
+
+
+class SphinxStream:
+    """Incremental PocketSphinx decoding with a hypothesis after every chunk"""
+
+    def __init__(self, engine, decoder):
+        self.engine = engine
+        self.decoder = decoder
+        self.in_utterance = False
+
+    def feed(self, pcm):
+        if not self.in_utterance:
+            self.decoder.start_utt()
+            self.in_utterance = True
+        self.decoder.process_raw(pcm, full_utt=False)
+        hyp = self.decoder.hyp()
+        return hyp.hypstr if hyp is not None else ''
+
+    def finish(self):
+        if not self.in_utterance:
+            return ''
+        self.decoder.end_utt()
+        self.in_utterance = False
+        hyp = self.decoder.hyp()
+        return hyp.hypstr if hyp is not None else ''
+
+    def close(self):
+        if self.in_utterance:
+            self.decoder.end_utt()
+            self.in_utterance = False
+        self.engine.release(self.decoder)
+
+
+class SphinxEngine:
+    """Offline CMU PocketSphinx decoder, loaded once and reused.
+
+    `Recognizer.recognize_sphinx` builds a new decoder (and reloads the
+    acoustic model) on every call; this keeps one warm instance instead.
+    The decoder is not thread-safe, so calls are serialized. Streams get
+    decoders of their own, which are returned to an idle list on close.
+    """
+
+    name = 'sphinx'
+
+    def __init__(self):
+        from pocketsphinx import Decoder  # type: ignore
+        self.Decoder = Decoder
+        self.decoder = Decoder(samprate=SAMPLE_RATE)
+        self.lock = threading.Lock()
+        self.idle = []
+        # Page the model in now rather than on the first real request
+        self._decode(bytes(SAMPLE_RATE // 10 * SAMPLE_WIDTH))
+
+    def _decode(self, pcm):
+        with self.lock:
+            self.decoder.start_utt()
+            self.decoder.process_raw(pcm, full_utt=True)
+            self.decoder.end_utt()
+            hyp = self.decoder.hyp()
+        return hyp.hypstr if hyp is not None else ''
+
+    def recognize(self, audio):
+        text = self._decode(audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=SAMPLE_WIDTH))
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+    def stream(self):
+        with self.lock:
+            decoder = self.idle.pop() if self.idle else None
+        return SphinxStream(self, decoder or self.Decoder(samprate=SAMPLE_RATE))
+
+    def release(self, decoder):
+        with self.lock:
+            self.idle.append(decoder)
+
+
+ENGINES = {
+    GoogleEngine.name: GoogleEngine,
+    SphinxEngine.name: SphinxEngine,
+}
+
+
+class EngineRegistry:
+    """Engines loaded once and kept for the life of the process.
+
+    Engines in `preload` are created up front; any other known engine is
+    created on first use. `recognize()` raises the usual SpeechRecognition
+    exceptions (UnknownValueError, RequestError), and when the requested
+    engine raises RequestError it retries on the loaded `fallback` engine.
+    """
+
+    def __init__(self, default=DEFAULT_ENGINE, preload=(), fallback=FALLBACK_ENGINE):
+        self.default = default
+        self.fallback = fallback
+        self.engines = {}
+        self.lock = threading.Lock()
+        for name in dict.fromkeys((default,) + tuple(preload)):
+            try:
+                self.get(name)
+            except Exception as e:
+                print(f"Speech engine '{name}' unavailable: {e}")
+
+    def get(self, name=None):
+        name = name or self.default
+        if name not in ENGINES:
+            raise ValueError(f"Unknown speech engine '{name}' (choose from {', '.join(ENGINES)})")
+        with self.lock:
+            engine = self.engines.get(name)
+            if engine is None:
+                engine = ENGINES[name]()
+                self.engines[name] = engine
+            return engine
+
+    def recognize(self, audio, name=None):
+        """Return (text, engine name).
+
+        An UnknownValueError carries the name of the engine that found no
+        speech as its `engine` attribute, which is the fallback's when the
+        requested engine could not be reached.
+        """
+        engine = self.get(name)
+        try:
+            return self._recognize(engine, audio)
+        except sr.RequestError:
+            fallback = self.engines.get(self.fallback)
+            if fallback is None or fallback is engine:
+                raise
+            return self._recognize(fallback, audio)
+
+    @staticmethod
+    def _recognize(engine, audio):
+        try:
+            return engine.recognize(audio), engine.name
+        except sr.UnknownValueError as e:
+            e.engine = engine.name
+            raise
+
+    def loaded(self):
+        return list(self.engines)
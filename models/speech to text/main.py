@@ -6,23 +6,21 @@ from tkinter import ttk, scrolledtext
 import threading
 from datetime import datetime
 
-def real_time_speech_to_text():
+from engines import EngineRegistry, DEFAULT_ENGINE, FALLBACK_ENGINE
+from pipeline import SpeechPipeline
+
+def real_time_speech_to_text(engine=DEFAULT_ENGINE):
     """
     Continuous real-time speech-to-text converter.
     Listens to microphone input and converts speech to text in real-time.
     """
-    # Initialize recognizer
-    recognizer = sr.Recognizer()
+    # Load the recognition engine once; the local engine doubles as fallback
+    engines = EngineRegistry(engine, preload=(FALLBACK_ENGINE,))
     
     # Get the microphone
     microphone = sr.Microphone()
     
     print("Initializing speech recognition system...")
-    print("Adjusting for ambient noise... Please wait.")
-    
-    # Adjust for ambient noise
-    with microphone as source:
-        recognizer.adjust_for_ambient_noise(source, duration=2)
     
     print("\n" + "="*60)
     print("Real-Time Speech-to-Text System")
@@ -31,46 +29,40 @@ def real_time_speech_to_text():
     print("Press Ctrl+C to stop.\n")
     print("="*60 + "\n")
     
+    stopped = threading.Event()
+    
+    def show_result(segment):
+        captured = time.strftime('%H:%M:%S', time.localtime(segment.started_at))
+        if segment.status == 'success':
+            print(f"[{captured}] You said: {segment.text}")
+        elif segment.status == 'unknown':
+            print(f"[{captured}] [Could not understand audio - please speak clearly]")
+        elif segment.status == 'request_error':
+            # API was unreachable or unresponsive
+            print(f"\nError: Could not request results from speech recognition service: {segment.text}")
+            print("Please check your internet connection.")
+            stopped.set()
+        else:
+            print(f"\nUnexpected error: {segment.text}")
+        print("-"*60)
+    
+    # Capture keeps running while earlier phrases are being recognized; the
+    # voice activity detector calibrates to the room as it goes
+    pipeline = SpeechPipeline(microphone, engines, show_result)
+    pipeline.start()
+    
     try:
-        while True:
-            try:
-                with microphone as source:
-                    # Listen for speech with timeout
-                    audio = recognizer.listen(source, timeout=5, phrase_time_limit=10)
-                
-                print("Processing speech...", end=" ")
-                
-                # Recognize speech using Google Speech Recognition
-                text = recognizer.recognize_google(audio)
-                
-                # Display the recognized text
-                print("\r" + " "*50 + "\r", end="")  # Clear the "Processing" message
-                print(f"[{time.strftime('%H:%M:%S')}] You said: {text}")
-                print("-"*60)
-                
-            except sr.WaitTimeoutError:
-                # No speech detected within timeout
-                pass
-            
-            except sr.UnknownValueError:
-                # Speech was unintelligible
-                print("\r" + " "*50 + "\r", end="")
-                print("[Could not understand audio - please speak clearly]")
-                print("-"*60)
-            
-            except sr.RequestError as e:
-                # API was unreachable or unresponsive
-                print(f"\nError: Could not request results from speech recognition service: {e}")
-                print("Please check your internet connection.")
-                break
-            
-            except Exception as e:
-                print(f"\nUnexpected error: {e}")
-                continue
+        while not stopped.wait(timeout=0.5):
+            pass
+        pipeline.stop()
     
     except KeyboardInterrupt:
+        pipeline.stop()
+        stats = pipeline.stats()
         print("\n\n" + "="*60)
         print("Speech recognition stopped by user.")
+        print(f"Segments: {stats['captured']} captured, {stats['recognized']} recognized, "
+              f"{stats['dropped']} dropped (max queue depth {stats['max_depth']})")
         print("="*60)
         sys.exit(0)
 
@@ -90,7 +82,7 @@ def test_microphone():
         return False
 
 class SpeechToTextGUI:
-    def __init__(self, root):
+    def __init__(self, root, engine=DEFAULT_ENGINE):
         self.root = root
         self.root.title("Real-Time Speech to Text Converter")
         self.root.geometry("800x600")
@@ -102,7 +94,7 @@ class SpeechToTextGUI:
         
         # Variables
         self.is_listening = False
-        self.recognizer = sr.Recognizer()
+        self.engines = EngineRegistry(engine, preload=(FALLBACK_ENGINE,))
         self.microphone = None
         self.listen_thread = None
         
@@ -286,57 +278,39 @@ class SpeechToTextGUI:
         self.update_status("Status: Stopped")
     
     def listen_loop(self):
-        """Main listening loop that runs in a separate thread"""
-        # Adjust for ambient noise
-        try:
-            with self.microphone as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
-        except Exception as e:
-            self.append_text(f"\n[Error adjusting for noise: {e}]\n", "error")
-            self.stop_listening()
-            return
+        """Run the capture/recognition pipeline and report its progress"""
+        # No ambient noise calibration: the voice activity detector tracks
+        # the noise floor continuously while listening
+        pipeline = SpeechPipeline(self.microphone, self.engines, self.show_result)
+        pipeline.start()
         
         while self.is_listening:
-            try:
-                with self.microphone as source:
-                    # Update status
-                    self.root.after(0, lambda: self.update_status("Status: Listening..."))
-                    
-                    # Listen for speech
-                    audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=10)
-                    
-                    # Update status to processing
-                    self.root.after(0, lambda: self.update_status("Status: Processing..."))
-                    
-                    # Recognize speech
-                    text = self.recognizer.recognize_google(audio)
-                    
-                    # Display recognized text
-                    timestamp = datetime.now().strftime("%H:%M:%S")
-                    self.root.after(0, lambda t=text, ts=timestamp: self.append_text(f"[{ts}] {t}\n"))
-                    
-            except sr.WaitTimeoutError:
-                # No speech detected, continue
-                continue
-            
-            except sr.UnknownValueError:
-                # Speech was unintelligible
-                self.root.after(0, lambda: self.append_text("[Could not understand audio]\n", "warning"))
-            
-            except sr.RequestError as e:
-                # API error
-                self.root.after(0, lambda e=e: self.append_text(f"\n[API Error: {e}]\n", "error"))
-                self.root.after(0, self.stop_listening)
-                break
-            
-            except Exception as e:
-                # Other errors
-                if self.is_listening:  # Only show error if still supposed to be listening
-                    self.root.after(0, lambda e=e: self.append_text(f"\n[Error: {e}]\n", "error"))
+            stats = pipeline.stats()
+            status = (f"Status: Listening... | queued {stats['queue_depth']}, "
+                      f"dropped {stats['dropped']}, noise floor {stats.get('noise_floor', '-')}")
+            self.root.after(0, lambda s=status: self.update_status(s))
+            time.sleep(0.5)
+        
+        pipeline.stop()
         
         # Update status when loop ends
         self.root.after(0, lambda: self.update_status("Status: Stopped"))
     
+    def show_result(self, segment):
+        """Display one recognized segment (called in capture order from a worker)"""
+        timestamp = datetime.fromtimestamp(segment.started_at).strftime("%H:%M:%S")
+        if segment.status == 'success':
+            self.root.after(0, lambda t=segment.text, ts=timestamp: self.append_text(f"[{ts}] {t}\n"))
+        elif segment.status == 'unknown':
+            # Speech was unintelligible
+            self.root.after(0, lambda: self.append_text("[Could not understand audio]\n", "warning"))
+        elif segment.status == 'request_error':
+            # API error
+            self.root.after(0, lambda e=segment.text: self.append_text(f"\n[API Error: {e}]\n", "error"))
+            self.root.after(0, self.stop_listening)
+        elif self.is_listening:  # Only show error if still supposed to be listening
+            self.root.after(0, lambda e=segment.text: self.append_text(f"\n[Error: {e}]\n", "error"))
+    
     def append_text(self, text, tag="normal"):
         """Append text to the display"""
         self.text_display.config(state=tk.NORMAL)
@@ -377,14 +351,14 @@ class SpeechToTextGUI:
             self.listen_thread.join(timeout=1)
         self.root.destroy()
 
-def run_gui():
+def run_gui(engine=DEFAULT_ENGINE):
     """Launch the GUI version"""
     root = tk.Tk()
-    app = SpeechToTextGUI(root)
+    app = SpeechToTextGUI(root, engine)
     root.protocol("WM_DELETE_WINDOW", app.on_closing)
     root.mainloop()
 
-def run_cli():
+def run_cli(engine=DEFAULT_ENGINE):
     """Launch the CLI version"""
     print("\nWelcome to Real-Time Speech-to-Text Converter\n")
     
@@ -395,15 +369,20 @@ def run_cli():
         print("="*60 + "\n")
         
         # Start real-time speech recognition
-        real_time_speech_to_text()
+        real_time_speech_to_text(engine)
     else:
         print("\nMicrophone test failed. Please check your microphone connection.")
         sys.exit(1)
 
 if __name__ == "__main__":
+    # Recognition engine: --engine google (default) or --engine sphinx (offline)
+    engine = DEFAULT_ENGINE
+    if "--engine" in sys.argv[1:-1]:
+        engine = sys.argv[sys.argv.index("--engine") + 1]
+    
     # Check if user wants GUI or CLI
     if len(sys.argv) > 1 and sys.argv[1] == "--cli":
-        run_cli()
+        run_cli(engine)
     else:
         # Default to GUI
-        run_gui()
\ No newline at end of file
+        run_gui(engine)
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""Capture / recognition pipeline for the desktop speech-to-text app"""
+
+import queue
+import threading
+import time
+
+import speech_recognition as sr  # type: ignore
+
+from resample import PCMNormalizer, TARGET_RATE, WIDTH_FORMATS
+from vad import VoiceSegmenter
+
+# Segments waiting for recognition; new ones are dropped when it is full
+MAX_QUEUE = 8
+# Segments recognized at the same time (recognition is mostly network wait)
+RECOGNITION_WORKERS = 3
+
+
+class Segment:
+    """One captured phrase and, once recognized, its result"""
+
+    def __init__(self, seq, audio, started_at):
+        self.seq = seq
+        self.audio = audio
+        self.started_at = started_at
+        self.status = None
+        self.text = None
+
+
+class SpeechPipeline:
+    """Capture audio continuously while a worker pool recognizes it.
+
+    A capture thread keeps the microphone open, reads it continuously and
+    lets a VoiceSegmenter cut voiced phrases out of the stream, pushing
+    each onto a bounded queue; silence never reaches recognition. Workers
+    recognize segments concurrently; results are released to
+    `on_result(segment)` strictly in capture order. `segment.status` is
+    'success', 'unknown', 'request_error' (the engine's service could not
+    be reached) or 'error'; for the last two `segment.text` is the message.
+    """
+
+    def __init__(self, microphone, engines, on_result,
+                 workers=RECOGNITION_WORKERS, max_queue=MAX_QUEUE):
+        self.microphone = microphone
+        self.engines = engines
+        self.on_result = on_result
+        self.num_workers = workers
+        self.segments = queue.Queue(maxsize=max_queue)
+        self.running = False
+        self.threads = []
+        # Reorder buffer: finished segments wait here until earlier ones are
+        # done. Results are delivered under the lock so they stay in order.
+        self.lock = threading.RLock()
+        self.finished = {}
+        self.next_seq = 0
+        self.captured = 0
+        self.dropped = 0
+        self.recognized = 0
+        self.max_depth = 0
+        self.segmenter = None
+
+    def start(self):
+        self.running = True
+        self.threads = [threading.Thread(target=self._capture, daemon=True)]
+        self.threads += [threading.Thread(target=self._recognize, daemon=True)
+                         for _ in range(self.num_workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self, timeout=1):
+        self.running = False
+        # Every worker needs a sentinel; queued segments make way for them
+        for _ in range(self.num_workers):
+            while True:
+                try:
+                    self.segments.put_nowait(None)
+                    break
+                except queue.Full:
+                    try:
+                        self.segments.get_nowait()
+                    except queue.Empty:
+                        pass
+        for thread in self.threads:
+            thread.join(timeout=timeout)
+
+    def stats(self):
+        with self.lock:
+            stats = {
+                'queue_depth': self.segments.qsize(),
+                'max_depth': self.max_depth,
+                'captured': self.captured,
+                'dropped': self.dropped,
+                'recognized': self.recognized,
+            }
+        segmenter = self.segmenter
+        if segmenter is not None:
+            stats['noise_floor'] = round(float(segmenter.vad.floor), 1)
+            stats['voiced'] = segmenter.frames_voiced / max(segmenter.frames_seen, 1)
+        return stats
+
+    def _capture(self):
+        with self.microphone as source:
+            # Microphones deliver whatever rate the device runs at (often
+            # 44.1 or 48 kHz); segments are cut and recognized at 16 kHz
+            normalizer = PCMNormalizer(source.SAMPLE_RATE, WIDTH_FORMATS[source.SAMPLE_WIDTH])
+            self.segmenter = VoiceSegmenter(TARGET_RATE)
+            while self.running:
+                pcm = normalizer.push(source.stream.read(source.CHUNK))
+                for voiced in self.segmenter.push(pcm):
+                    self._enqueue(sr.AudioData(voiced, TARGET_RATE, 2))
+
+    def _enqueue(self, audio):
+        duration = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+        with self.lock:
+            segment = Segment(self.captured, audio, time.time() - duration)
+            self.captured += 1
+        try:
+            self.segments.put_nowait(segment)
+            with self.lock:
+                self.max_depth = max(self.max_depth, self.segments.qsize())
+        except queue.Full:
+            # Mark it done so the reorder buffer does not wait for it
+            with self.lock:
+                self.dropped += 1
+            segment.status = 'dropped'
+            self._finish(segment)
+
+    def _recognize(self):
+        while self.running:
+            segment = self.segments.get()
+            if segment is None:
+                break
+            try:
+                segment.text, _ = self.engines.recognize(segment.audio)
+                segment.status = 'success'
+            except sr.UnknownValueError:
+                segment.status = 'unknown'
+            except sr.RequestError as e:
+                segment.status = 'request_error'
+                segment.text = str(e)
+            except Exception as e:
+                segment.status = 'error'
+                segment.text = str(e)
+            segment.audio = None
+            if not self.running:
+                # Stopped while recognizing: the caller no longer wants results
+                break
+            with self.lock:
+                self.recognized += 1
+            self._finish(segment)
+
+    def _finish(self, segment):
+        with self.lock:
+            self.finished[segment.seq] = segment
+            while self.next_seq in self.finished:
+                done = self.finished.pop(self.next_seq)
+                self.next_seq += 1
+                if done.status != 'dropped':
+                    self.on_result(done)
@@ -0,0 +1,185 @@
+"""Conversion of arbitrary PCM to the 16 kHz 16-bit mono the engines expect"""
+
+import math
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# What every engine is fed
+TARGET_RATE = 16000
+# Bytes per sample of each supported encoding (all little-endian; 8-bit is
+# unsigned as in WAV)
+SAMPLE_FORMATS = {'u8': 1, 's16': 2, 's24': 3, 's32': 4, 'f32': 4}
+# Integer format for a sample width, as devices and WAV files report it
+WIDTH_FORMATS = {1: 'u8', 2: 's16', 3: 's24', 4: 's32'}
+# Input rates and channel counts accepted
+MIN_RATE, MAX_RATE = 1000, 384000
+MAX_CHANNELS = 32
+# Input frames converted at a time; bounds float scratch memory per call
+BLOCK_FRAMES = 1 << 15
+# Filter zero crossings on each side of the centre tap, and how far below
+# the lower Nyquist frequency the pass band ends
+ZERO_CROSSINGS = 16
+ROLLOFF = 0.94
+KAISER_BETA = 8.6
+
+
+def to_float(buf, sample_format):
+    """Samples of a little-endian PCM buffer as float32 in [-1, 1)"""
+    if sample_format == 'f32':
+        return np.frombuffer(buf, '<f4').astype(np.float32)
+    if sample_format == 'u8':
+        return (np.frombuffer(buf, np.uint8).astype(np.float32) - 128) / 128
+    if sample_format == 's16':
+        return np.frombuffer(buf, '<i2').astype(np.float32) / 32768
+    if sample_format == 's32':
+        return (np.frombuffer(buf, '<i4') / 2 ** 31).astype(np.float32)
+    # Packed 24-bit: assemble each sample in the top of an int32 so the
+    # arithmetic shift back down sign-extends it
+    raw = np.frombuffer(buf, np.uint8).reshape(-1, 3).astype(np.int32)
+    samples = (raw[:, 0] << 8) | (raw[:, 1] << 16) | (raw[:, 2] << 24)
+    return (samples >> 8).astype(np.float32) / 2 ** 23
+
+
+def to_int16(samples):
+    """Little-endian 16-bit PCM bytes of float samples, clipped to range"""
+    return np.clip(np.rint(samples * 32768), -32768, 32767).astype('<i2').tobytes()
+
+
+class PolyphaseResampler:
+    """Streaming rational-ratio resampler for float mono samples.
+
+    Upsampling by `up`, low-pass filtering and downsampling by `down` is
+    done as one polyphase filter: each output sample is a dot product of
+    `taps` consecutive inputs with one of `up` sub-filters of a
+    Kaiser-windowed sinc, so nothing at the upsampled rate is ever
+    computed. Outputs sharing a sub-filter read inputs a fixed stride
+    apart, so each sub-filter is a single matrix-vector product over a
+    strided view of the input. `push()` returns what the input so far
+    determines; `flush()` pads the end with silence and returns the rest.
+    """
+
+    def __init__(self, rate_in, rate_out, zero_crossings=ZERO_CROSSINGS):
+        g = math.gcd(rate_in, rate_out)
+        self.up, self.down = rate_out // g, rate_in // g
+        stretch = max(self.up, self.down)
+        half = zero_crossings * stretch
+        t = np.arange(-half, half + 1)
+        cutoff = ROLLOFF * 0.5 / stretch
+        h = 2 * cutoff * np.sinc(2 * cutoff * t) * np.kaiser(len(t), KAISER_BETA) * self.up
+        self.taps = -(-len(h) // self.up)
+        h = np.concatenate((h, np.zeros(self.taps * self.up - len(h))))
+        # bank[p] holds sub-filter p reversed, to line up with inputs oldest first
+        self.bank = np.ascontiguousarray(h.reshape(self.taps, self.up).T[:, ::-1], np.float32)
+        self.delay = half
+        # Inputs still needed, starting at absolute index `start`; the
+        # stream is preceded by silence so the first outputs are defined
+        self.buffer = np.zeros(self.taps - 1, np.float32)
+        self.start = -(self.taps - 1)
+        self.produced = 0
+        self.consumed = 0
+
+    def push(self, samples):
+        self.buffer = np.concatenate((self.buffer, np.asarray(samples, np.float32)))
+        self.consumed += len(samples)
+        return self._run(None)
+
+    def flush(self):
+        self.buffer = np.concatenate((self.buffer, np.zeros(self.taps + self.delay // self.up + 1, np.float32)))
+        return self._run(-(-self.consumed * self.up // self.down))
+
+    def _run(self, limit):
+        up, down = self.up, self.down
+        end = self.start + len(self.buffer)
+        # Outputs whose newest input has arrived: (n * down + delay) // up < end
+        stop = max((end * up - 1 - self.delay) // down + 1, self.produced)
+        if limit is not None:
+            stop = min(stop, limit)
+        count = stop - self.produced
+        out = np.empty(count, np.float32)
+        windows = sliding_window_view(self.buffer, self.taps)
+        for r in range(min(up, count)):
+            n = self.produced + r
+            m = n * down + self.delay
+            first = m // up - (self.taps - 1) - self.start
+            outputs = len(range(r, count, up))
+            # Every `up` outputs the sub-filter repeats and the input advances by `down`
+            out[r::up] = windows[first:first + (outputs - 1) * down + 1:down] @ self.bank[m % up]
+        self.produced = stop
+        keep = (self.produced * down + self.delay) // up - (self.taps - 1)
+        self.buffer = self.buffer[keep - self.start:]
+        self.start = keep
+        return out
+
+
+class PCMNormalizer:
+    """Convert a PCM stream to 16 kHz 16-bit mono, a block at a time.
+
+    The input format is declared up front: sample `rate`, `sample_format`
+    (one of SAMPLE_FORMATS) and interleaved `channels`. `push(buf)` takes
+    bytes of any length, carrying a partial frame over to the next call,
+    and returns the converted PCM so far; `flush()` returns the resampler
+    tail at the end of the stream and starts a new one. Each block of at
+    most BLOCK_FRAMES frames is decoded to float, downmixed by averaging
+    the channels and resampled, so float copies of a long input never
+    exist all at once. Input already in the target format passes through
+    unchanged.
+    """
+
+    def __init__(self, rate, sample_format='s16', channels=1, target_rate=TARGET_RATE):
+        if sample_format not in SAMPLE_FORMATS:
+            raise ValueError(f"sample format must be one of {', '.join(SAMPLE_FORMATS)}")
+        if not MIN_RATE <= rate <= MAX_RATE:
+            raise ValueError(f"unsupported sample rate {rate}")
+        if not 1 <= channels <= MAX_CHANNELS:
+            raise ValueError(f"unsupported channel count {channels}")
+        self.rate = rate
+        self.sample_format = sample_format
+        self.channels = channels
+        self.frame_bytes = SAMPLE_FORMATS[sample_format] * channels
+        self.passthrough = (rate, sample_format, channels) == (target_rate, 's16', 1)
+        self.target_rate = target_rate
+        self.resampler = PolyphaseResampler(rate, target_rate) if rate != target_rate else None
+        self.pending = b''
+        self.frames_in = 0
+
+    def push(self, buf):
+        out = bytearray()
+        self._convert(buf, out)
+        return bytes(out)
+
+    def flush(self):
+        self.pending = b''
+        if self.resampler is None:
+            return b''
+        tail = to_int16(self.resampler.flush())
+        self.resampler = PolyphaseResampler(self.rate, self.target_rate)
+        return tail
+
+    def _convert(self, buf, out):
+        view = memoryview(buf).cast('B')
+        if self.pending:
+            view = memoryview(self.pending + bytes(view))
+        usable = len(view) // self.frame_bytes * self.frame_bytes
+        self.pending = bytes(view[usable:])
+        self.frames_in += usable // self.frame_bytes
+        if self.passthrough:
+            out += view[:usable]
+            return
+        block = BLOCK_FRAMES * self.frame_bytes
+        for start in range(0, usable, block):
+            samples = to_float(view[start:min(start + block, usable)], self.sample_format)
+            if self.channels > 1:
+                samples = samples.reshape(-1, self.channels).mean(axis=1, dtype=np.float32)
+            if self.resampler is not None:
+                samples = self.resampler.push(samples)
+            out += to_int16(samples)
+
+
+def normalize_pcm(buf, rate, sample_format='s16', channels=1, target_rate=TARGET_RATE):
+    """A whole PCM buffer converted to 16 kHz 16-bit mono bytes"""
+    normalizer = PCMNormalizer(rate, sample_format, channels, target_rate)
+    out = bytearray()
+    normalizer._convert(buf, out)
+    out += normalizer.flush()
+    return bytes(out)
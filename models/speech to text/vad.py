@@ -0,0 +1,195 @@
+"""Energy / zero-crossing voice activity detection with a rolling noise floor"""
+
+from collections import deque
+
+import numpy as np
+
+# Analysis frame length
+FRAME_MS = 30
+# A frame is speech when its RMS is this many times the noise floor...
+ENERGY_RATIO = 3.0
+# ...or a softer ratio with a high zero-crossing rate (fricatives like s, f)
+FRICATIVE_RATIO = 1.5
+FRICATIVE_ZCR = 0.25
+# Floor for the speech threshold so digital silence is never "voiced"
+MIN_ENERGY = 60.0
+# Weight of each non-speech frame in the noise floor moving average
+FLOOR_ADAPT = 0.05
+# Much smaller weight for speech frames, so a lasting rise in background
+# noise is eventually absorbed without speech raising the floor meanwhile
+FLOOR_CREEP = 0.001
+# Noise floor assumed before any audio has been seen
+INITIAL_FLOOR = 100.0
+# Segmenting
+PREROLL_MS = 300
+ENDPOINT_MS = 800
+MIN_SPEECH_MS = 250
+MAX_SEGMENT_MS = 10000
+# Frames converted to float at once by frame_features (about 30 s)
+FEATURE_BLOCK_FRAMES = 1000
+
+
+def frame_features(samples, frame_len, block_frames=FEATURE_BLOCK_FRAMES):
+    """Per-frame RMS energy and zero-crossing rate of int16 samples.
+
+    Trailing samples that do not fill a frame are ignored; callers carry
+    them over to the next call. Long inputs are converted to float a block
+    of frames at a time, so scratch memory stays bounded by the block
+    rather than growing with the clip.
+    """
+    count = len(samples) // frame_len
+    frames = samples[:count * frame_len].reshape(count, frame_len)
+    energy = np.empty(count, np.float32)
+    zcr = np.empty(count, np.float64)
+    for start in range(0, count, block_frames):
+        block = frames[start:start + block_frames].astype(np.float32)
+        energy[start:start + len(block)] = np.sqrt(np.mean(block * block, axis=1))
+        signs = np.signbit(block)
+        zcr[start:start + len(block)] = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame_len - 1)
+    return energy, zcr
+
+
+class EnergyVAD:
+    """Classify fixed-size frames as speech or not against an adaptive floor.
+
+    The noise floor is a moving average over frames judged non-speech, so
+    it follows the room continuously instead of being measured once up
+    front; it drops immediately to any quieter frame and only creeps up
+    during speech.
+    """
+
+    def __init__(self, sample_rate, frame_ms=FRAME_MS, floor=INITIAL_FLOOR):
+        self.frame_len = sample_rate * frame_ms // 1000
+        self.floor = floor
+
+    def classify(self, samples):
+        """Return a boolean speech mask, one entry per whole frame in `samples`"""
+        energy, zcr = frame_features(samples, self.frame_len)
+        voiced = np.empty(len(energy), bool)
+        # Frames are few per call; the floor has to update frame by frame
+        for i, (e, z) in enumerate(zip(energy, zcr)):
+            loud = e > max(self.floor * ENERGY_RATIO, MIN_ENERGY)
+            fricative = e > max(self.floor * FRICATIVE_RATIO, MIN_ENERGY) and z > FRICATIVE_ZCR
+            voiced[i] = loud or fricative
+            weight = FLOOR_CREEP if voiced[i] else FLOOR_ADAPT
+            self.floor = min(e, self.floor + weight * (e - self.floor))
+        return voiced
+
+
+class VoiceSegmenter:
+    """Cut a continuous PCM stream into voiced segments.
+
+    `push(pcm)` accepts 16-bit mono PCM of any length and returns the list
+    of complete segments (bytes) it closed. Each segment starts with up to
+    PREROLL_MS of lead-in and ends after ENDPOINT_MS of silence or at
+    MAX_SEGMENT_MS; bursts shorter than MIN_SPEECH_MS are discarded.
+    """
+
+    def __init__(self, sample_rate, vad=None):
+        self.vad = vad or EnergyVAD(sample_rate)
+        frame_ms = self.vad.frame_len * 1000 / sample_rate
+        self.preroll_frames = int(PREROLL_MS / frame_ms)
+        self.endpoint_frames = int(ENDPOINT_MS / frame_ms)
+        self.min_speech_frames = int(MIN_SPEECH_MS / frame_ms)
+        self.max_frames = int(MAX_SEGMENT_MS / frame_ms)
+        self.pending = np.empty(0, np.int16)
+        self.preroll = deque(maxlen=self.preroll_frames)
+        self.segment = []
+        self.speech_frames = 0
+        self.silent_frames = 0
+        self.frames_seen = 0
+        self.frames_voiced = 0
+        self.frames_discarded = 0
+
+    def push(self, pcm):
+        samples = np.concatenate((self.pending, np.frombuffer(pcm, np.int16)))
+        voiced = self.vad.classify(samples)
+        used = len(voiced) * self.vad.frame_len
+        self.pending = samples[used:]
+        frames = samples[:used].reshape(len(voiced), self.vad.frame_len)
+        self.frames_seen += len(voiced)
+        self.frames_voiced += int(np.count_nonzero(voiced))
+
+        closed = []
+        for frame, is_speech in zip(frames, voiced):
+            if not self.segment:
+                if not is_speech:
+                    self.preroll.append(frame)
+                    continue
+                self.segment = list(self.preroll) + [frame]
+                self.preroll.clear()
+                self.speech_frames, self.silent_frames = 1, 0
+                continue
+            self.segment.append(frame)
+            if is_speech:
+                self.speech_frames += 1
+                self.silent_frames = 0
+            else:
+                self.silent_frames += 1
+            if self.silent_frames >= self.endpoint_frames or len(self.segment) >= self.max_frames:
+                segment = self.flush()
+                if segment is not None:
+                    closed.append(segment)
+        return closed
+
+    def flush(self):
+        """Close the current segment; None if it was too short to be speech"""
+        segment, self.segment = self.segment, []
+        if self.speech_frames < self.min_speech_frames:
+            self.frames_discarded += len(segment)
+            return None
+        return np.concatenate(segment).tobytes()
+
+
+def speech_spans(samples, sample_rate, max_chunk_ms=MAX_SEGMENT_MS):
+    """Sample ranges worth recognizing in a complete clip.
+
+    Offline counterpart of VoiceSegmenter for a whole buffer: the noise
+    floor is the clip's 10th-percentile frame energy and every step is
+    vectorized. Speech runs separated by less than ENDPOINT_MS are joined,
+    runs shorter than MIN_SPEECH_MS dropped, each run padded by PREROLL_MS,
+    and neighbouring runs merged while the result stays under
+    `max_chunk_ms`, so long clips are split at pauses; a run that is
+    longer on its own is cut at its quietest frames. Returns a list of
+    (start, end) sample indices; empty when the clip is silent.
+    """
+    frame_len = sample_rate * FRAME_MS // 1000
+    energy, zcr = frame_features(samples, frame_len)
+    if not len(energy):
+        return []
+    floor = np.percentile(energy, 10)
+    voiced = (energy > max(floor * ENERGY_RATIO, MIN_ENERGY)) | (
+        (energy > max(floor * FRICATIVE_RATIO, MIN_ENERGY)) & (zcr > FRICATIVE_ZCR))
+
+    # Run boundaries of the speech mask, as [start, end) frame indices
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], voiced.view(np.int8), [0]))))
+    starts, ends = edges[0::2], edges[1::2]
+    if not len(starts):
+        return []
+    gap_frames = ENDPOINT_MS // FRAME_MS
+    keep = np.concatenate(([True], starts[1:] - ends[:-1] >= gap_frames))
+    ends = np.maximum.reduceat(ends, np.flatnonzero(keep))
+    starts = starts[keep]
+    long_enough = ends - starts >= MIN_SPEECH_MS // FRAME_MS
+    starts, ends = starts[long_enough], ends[long_enough]
+
+    pad = PREROLL_MS // FRAME_MS
+    max_frames = max_chunk_ms // FRAME_MS
+    spans = []
+    for start, end in zip(np.maximum(starts - pad, 0), np.minimum(ends + pad, len(voiced))):
+        if spans and end - spans[-1][0] <= max_frames:
+            spans[-1][1] = end
+        else:
+            spans.append([start, end])
+
+    bounded = []
+    for start, end in spans:
+        # Speech with no pause long enough: cut at the quietest frame in
+        # the second half of the allowed length
+        while end - start > max_frames:
+            low = start + max_frames // 2
+            cut = low + int(np.argmin(energy[low:start + max_frames]))
+            bounded.append((start, cut))
+            start = cut
+        bounded.append((start, end))
+    return [(int(start) * frame_len, int(end) * frame_len) for start, end in bounded]